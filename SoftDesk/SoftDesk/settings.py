@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -77,12 +78,88 @@ WSGI_APPLICATION = 'SoftDesk.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# PostgreSQL when POSTGRES_DB is set, pooled (psycopg 3) when POSTGRES_POOL_MAX_SIZE is
+# set too, otherwise with persistent connections. SQLite by default, tuned for concurrent
+# writers by the PRAGMAS applied to each new connection (see signals.py).
+
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
+if os.environ.get('POSTGRES_DB'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ['POSTGRES_DB'],
+            'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    if os.environ.get('POSTGRES_POOL_MAX_SIZE'):  # pooling excludes persistent connections
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.environ['POSTGRES_POOL_MAX_SIZE']),
+                'timeout': int(os.environ.get('POSTGRES_POOL_TIMEOUT', 10)),
+            },
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',  # writers queue on BEGIN instead of failing on upgrade
+            },
+            'PRAGMAS': {
+                'journal_mode': 'wal',
+                'synchronous': 'normal',
+                'busy_timeout': 5000,
+                'mmap_size': 134217728,
+            },
+        }
+    }
+
+# Read replica for the list/retrieve actions (soft_desk_api/routers.py), a mirror of
+# the primary during tests. Users who just wrote read the primary for REPLICA_PIN_SECONDS.
+
+if os.environ.get('POSTGRES_DB') and os.environ.get('POSTGRES_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'], 'HOST': os.environ['POSTGRES_REPLICA_HOST'], 'TEST': {'MIRROR': 'default'},
+    }
+elif not os.environ.get('POSTGRES_DB') and os.environ.get('SQLITE_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        **DATABASES['default'], 'NAME': os.environ['SQLITE_REPLICA_PATH'], 'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['soft_desk_api.routers.ReplicaRouter']
+
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
-}
 
 
 # Password validation
@@ -104,6 +181,22 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PBKDF2 rounds per environment (PASSWORD_ITERATIONS, Django's default when unset).
+# Passwords hashed with other rounds or hashers are rehashed at their next login.
+# Test runs hash with MD5.
+
+PASSWORD_ITERATIONS = int(os.environ['PASSWORD_ITERATIONS']) if os.environ.get('PASSWORD_ITERATIONS') else None
+
+PASSWORD_HASHERS = [
+    'soft_desk_api.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -127,17 +220,29 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
+    'DEFAULT_AUTHENTICATION_CLASSES': ('soft_desk_api.authentication.ContributorJWTAuthentication',),
     'DEFAULT_PAGINATION_CLASS': 'soft_desk_api.pagination.CustomLimitOffsetPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'soft_desk_api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'PAGE_SIZE': 100,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated',]
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated',],
+    'DEFAULT_THROTTLE_RATES': {  # /api/token/, see soft_desk_api/throttling.py
+        'login_username': os.environ.get('LOGIN_USERNAME_RATE', '10/minute'),
+        'login_client': os.environ.get('LOGIN_CLIENT_RATE', '100/minute'),
+    },
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=4),
 }
 
+# Seconds a token's account stays trusted without a query (soft_desk_api/authentication.py),
+# unless the user is deleted or saved before
+AUTH_CACHE_SECONDS = int(os.environ.get('AUTH_CACHE_SECONDS', 60))
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Soft Desk API',
     'VERSION': 'v1',
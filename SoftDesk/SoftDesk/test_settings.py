@@ -0,0 +1,10 @@
+"""
+Settings of the test suite, for any runner:
+manage.py test soft_desk_api --settings=SoftDesk.test_settings
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import PASSWORD_HASHERS
+
+# the suite creates and logs in users by the hundred: a cheap hasher first, the production
+# ones still verify and upgrade the hashes tests make with them
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher', *PASSWORD_HASHERS]
@@ -6,6 +6,10 @@ from .models import Contributor, Project, Issue, Comment
 class ContributorAdmin(ModelAdmin):
     list_display = ("username", "age", "project_contributions", "issue_contributions", "comments", "can_be_contacted", "can_data_be_shared")
     fields = ("user", "age", "can_be_contacted")
+    list_select_related = ("user",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_statistics()
 
 
 @register(Project)
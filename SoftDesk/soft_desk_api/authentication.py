@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .models import Contributor
+
+CONTRIBUTOR_ID_CLAIM = "contributor_id"
+
+
+def active_contributor_key(user_id: int) -> str:
+    return f"active-contributor:{user_id}"
+
+
+def get_active_contributor(user_id: int) -> Contributor | None:
+    """
+    Contributor of the user, with its user, while the account exists and is active.
+    Cached for AUTH_CACHE_SECONDS: saving or deleting the user or the contributor drops the entry.
+    """
+    key = active_contributor_key(user_id)
+    contributor = cache.get(key)
+    if contributor is None:
+        contributor = Contributor.objects.select_related("user") \
+            .filter(user_id=user_id, user__is_active=True).first()
+        if contributor is not None:
+            cache.set(key, contributor, settings.AUTH_CACHE_SECONDS)
+    return contributor
+
+
+def invalidate_active_contributors(*user_ids: int):
+    cache.delete_many([active_contributor_key(user_id) for user_id in user_ids])
+
+
+class ContributorJWTAuthentication(JWTAuthentication):
+    """
+    Tokens carrying the contributor claim resolve request.user and request.user.contributor
+    through the cache of get_active_contributor(), without a query while it is warm, and
+    are refused once the user is deleted or deactivated. Tokens without the claim are
+    resolved by JWTAuthentication, request.user.contributor then loading on first access.
+    """
+
+    def get_user(self, validated_token) -> User:
+        contributor_id = validated_token.get(CONTRIBUTOR_ID_CLAIM)
+        if contributor_id is None:
+            return super().get_user(validated_token)
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])  # a string in tokens
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        contributor = get_active_contributor(user_id)
+        if contributor is None or contributor.id != contributor_id:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return contributor.user  # its reverse accessor is cached by select_related
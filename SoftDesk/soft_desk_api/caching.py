@@ -0,0 +1,167 @@
+from functools import partial
+from hashlib import md5
+from typing import Callable
+from django.core.cache import cache
+from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, Max, QuerySet, Sum
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+from rest_framework.status import HTTP_304_NOT_MODIFIED
+
+
+def now_and_on_commit(function: Callable, *args, using: str | None = None):
+    """
+    Calls function(*args) now and again once the transaction of `using` commits: reads
+    running meanwhile see the rows still committed and may cache them again, the second
+    call drops what they cached. Outside a transaction, calls it once.
+    """
+    function(*args)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(partial(function, *args), using=using)
+
+
+def version_key(name: str) -> str:
+    return f"version:{name}"
+
+
+def get_version(name: str) -> int:
+    return cache.get(version_key(name), 0)
+
+
+async def aget_version(name: str) -> int:
+    return await cache.aget(version_key(name), 0)
+
+
+def bump_version(*names: str):
+    """Expires every cache entry whose key embeds one of these versions"""
+    for name in names:
+        key = version_key(name)
+        if not cache.add(key, 1, timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:  # evicted between add() and incr()
+                cache.add(key, 1, timeout=None)
+
+
+class CachedResponseMixin:
+    """
+    Caches list and retrieve responses per user under the ETag set by ConditionalGetMixin,
+    which must precede it: the ETag follows the versions of the projects holding the rows,
+    bumped in the transaction of every write (see signals.py), so no entry cached from
+    rows read before a commit is served after it. Without an ETag, nothing is cached.
+    """
+    response_cache_timeout = 300
+    etag: str | None = None
+    last_modified: float | None = None
+
+    def get_response_cache_key(self, request) -> str:
+        # with the modification time: a project re-created under a deleted one's id restarts at version 1
+        digest: str = self.etag.strip('"')
+        return f"response:{request.user.pk}:{digest}:{self.last_modified}"
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if self.etag is None:
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            return Response(data, headers=headers)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and isinstance(response, Response):  # not streamed
+            cache.set(key, (response.data, dict(response.items())), self.response_cache_timeout)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    Strong ETag and Last-Modified on list and retrieve, derived from the version of the
+    projects holding the objects (`version_path` leads from the object to its project).
+    If-None-Match / If-Modified-Since are answered with 304 before any serialization.
+    """
+    version_path: str = ""
+
+    def get_detail_validators(self, request) -> tuple[str, float]:
+        related = self.version_path.removesuffix("__")
+        queryset = self.queryset.model.objects.all()
+        try:
+            obj = get_object_or_404(queryset.select_related(related) if related else queryset,
+                                    pk=self.kwargs["pk"])
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(request, obj)
+        project = obj
+        for name in filter(None, related.split("__")):
+            project = getattr(project, name)
+        return self.make_etag(request, obj.pk, project.version), project.updated_time.timestamp()
+
+    def get_list_validators(self, request) -> tuple[str, float | None]:
+        """
+        Fingerprint of the requested page: the ids and project versions of its rows, read
+        through the paginator (cached count, keyset pages), with the count and links.
+        Unpaginated and streamed lists aggregate over every listed row instead.
+        """
+        queryset: QuerySet = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        is_streamed = getattr(self, "is_streamed", None)
+        if self.paginator is None or (is_streamed is not None and is_streamed(request)):
+            return self.get_aggregate_validators(request, queryset)
+        rows: QuerySet = queryset.select_related(None).annotate(
+            page_version=F(f"{self.version_path}version"), page_updated_time=F(f"{self.version_path}updated_time"),
+        ).only("pk", *(getattr(self, "cursor_ordering", None) or ()))
+        page = self.paginator.paginate_queryset(rows, request, view=self)
+        if page is None:
+            return self.get_aggregate_validators(request, queryset)
+        last_modified = max((row.page_updated_time for row in page), default=None)
+        return (
+            self.make_etag(request, request.user.pk, [(row.pk, row.page_version) for row in page],
+                           self.paginator.count, self.paginator.get_next_link(),
+                           self.paginator.get_previous_link()),
+            last_modified.timestamp() if last_modified else None,
+        )
+
+    def get_aggregate_validators(self, request, queryset: QuerySet) -> tuple[str, float | None]:
+        """One aggregate over the listed rows, fingerprinting their ids and project versions"""
+        fingerprint: dict = queryset.aggregate(
+            rows=Count("pk"), ids=Sum("pk"),
+            versions=Sum(f"{self.version_path}version"),
+            last_modified=Max(f"{self.version_path}updated_time"),
+        )
+        last_modified = fingerprint.pop("last_modified")
+        return (self.make_etag(request, request.user.pk, *fingerprint.values()),
+                last_modified.timestamp() if last_modified else None)
+
+    def make_etag(self, request, *parts) -> str:
+        key = [request.get_full_path(), request.accepted_media_type, *parts]
+        return f'"{md5(repr(key).encode()).hexdigest()}"'
+
+    def get_conditional(self, handler, validators, request, *args, **kwargs):
+        etag, last_modified = validators
+        self.etag, self.last_modified = etag, last_modified  # the key of CachedResponseMixin
+        headers = {"ETag": etag}
+        if last_modified is not None:
+            headers["Last-Modified"] = http_date(last_modified)
+        if get_conditional_response(request._request, etag=etag, last_modified=last_modified):
+            return Response(status=HTTP_304_NOT_MODIFIED, headers=headers)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            for name, value in headers.items():
+                response[name] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_list_validators(request)
+        return self.get_conditional(super().list, validators, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        validators = self.get_detail_validators(request)
+        return self.get_conditional(super().retrieve, validators, request, *args, **kwargs)
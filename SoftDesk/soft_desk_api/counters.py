@@ -0,0 +1,166 @@
+"""
+Denormalised counters of projects and issues: issues per state, comments, and the time
+of the latest activity (the creation of the row, of an issue or a comment, or a state
+change). Kept as F() increments by signals.py and bulk creates, in the transaction of
+the write, and recomputed from the rows by the recount_counters command.
+"""
+from collections import Counter, defaultdict
+from django.db.models import F, Model, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.timezone import now
+from .models import Project, Issue, Comment, count_subquery
+
+ISSUE_COUNT_FIELDS: dict[str, str] = {
+    "TO DO": "todo_issue_count",
+    "In Progress": "in_progress_issue_count",
+    "Finished": "finished_issue_count",
+}
+
+
+class CounterUpdate:
+    """Deltas per project and issue, applied with one UPDATE per distinct change"""
+
+    def __init__(self, using: str = "default"):
+        self.using = using
+        self.deltas: dict[type[Model], defaultdict[int, Counter]] = {
+            Project: defaultdict(Counter), Issue: defaultdict(Counter)
+        }
+        self.active: dict[type[Model], set[int]] = {Project: set(), Issue: set()}
+
+    def add(self, model: type[Model], pk: int | Subquery | None, field: str | None = None, delta: int = 1,
+            active: bool = False) -> "CounterUpdate":
+        if pk is not None:
+            if field is not None:
+                self.deltas[model][pk][field] += delta
+            if active:
+                self.active[model].add(pk)
+        return self
+
+    def apply(self):
+        timestamp = now()
+        for model, deltas in self.deltas.items():
+            groups: defaultdict[tuple, list[int]] = defaultdict(list)
+            for pk in deltas.keys() | self.active[model]:
+                change = frozenset((field, delta) for field, delta in deltas[pk].items() if delta)
+                groups[(change, pk in self.active[model])].append(pk)
+            for (change, active), pks in groups.items():
+                values = {field: F(field) + delta for field, delta in change}
+                if active:
+                    values["last_activity_time"] = timestamp
+                if values:
+                    rows = model.objects.using(self.using)
+                    rows = rows.filter(pk=pks[0]) if len(pks) == 1 else rows.filter(pk__in=pks)
+                    rows.update(**values)
+
+
+def issue_projects(comments: tuple[Comment, ...], issue_ids: set[int], using: str) -> dict[int, int | Subquery]:
+    """
+    Project of each of `issue_ids`, from the issues cached on `comments`, else from one
+    query, or a subquery of the UPDATE when a single project is missing.
+    """
+    projects: dict[int, int | Subquery] = {
+        comment.issue_id: comment.issue.project_id for comment in comments if Comment.issue.is_cached(comment)
+    }
+    missing: set[int] = issue_ids - projects.keys()
+    if len(missing) == 1 and len(issue_ids) == 1:
+        issue_id = missing.pop()
+        projects[issue_id] = Subquery(Issue.objects.filter(pk=issue_id).values("project_id"))
+    elif missing:
+        projects.update(Issue.objects.using(using).filter(pk__in=missing).values_list("id", "project_id"))
+    return projects
+
+
+def count_created_issues(*issues: Issue, using: str = "default"):
+    update = CounterUpdate(using)
+    for issue in issues:
+        update.add(Project, issue.project_id, ISSUE_COUNT_FIELDS[issue.state], active=True)
+        issue.counted_as = (issue.project_id, issue.state)
+    update.apply()
+
+
+def count_changed_issue(issue: Issue, using: str = "default"):
+    """Moves the issue, and its comments, between the counters of its previous and new state or project"""
+    project_id, state = issue.counted_as
+    if (project_id, state) == (issue.project_id, issue.state):
+        return
+    update = CounterUpdate(using) \
+        .add(Project, project_id, ISSUE_COUNT_FIELDS[state], -1) \
+        .add(Project, issue.project_id, ISSUE_COUNT_FIELDS[issue.state], active=True) \
+        .add(Issue, issue.pk, active=True)
+    update.apply()
+    if project_id != issue.project_id:
+        stored = Coalesce(Subquery(Issue.objects.filter(pk=issue.pk).values("comment_count")), 0)
+        Project.objects.using(using).filter(pk=project_id).update(comment_count=F("comment_count") - stored)
+        Project.objects.using(using).filter(pk=issue.project_id).update(comment_count=F("comment_count") + stored)
+    issue.counted_as = (issue.project_id, issue.state)
+
+
+def uncount_deleted_issue(issue: Issue, with_comments: bool, using: str = "default"):
+    """
+    Called before the issue row is removed, `with_comments` when its comments are not
+    uncounted one by one: the project loses the comment count stored on the issue.
+    """
+    project_id, state = issue.counted_as
+    values = {ISSUE_COUNT_FIELDS[state]: F(ISSUE_COUNT_FIELDS[state]) - 1}
+    if with_comments:
+        stored = Issue.objects.using(using).filter(pk=issue.pk).values("comment_count")
+        values["comment_count"] = F("comment_count") - Coalesce(Subquery(stored), 0)
+    Project.objects.using(using).filter(pk=project_id).update(**values)
+
+
+def count_comments(*comments: Comment, delta: int = 1, using: str = "default"):
+    """+1 (created) or -1 (deleted) comment on the issues and projects of `comments`"""
+    issue_ids: set[int] = {comment.issue_id for comment in comments}
+    projects: dict[int, int] = issue_projects(comments, issue_ids, using)
+    update = CounterUpdate(using)
+    for comment in comments:
+        update.add(Issue, comment.issue_id, "comment_count", delta, active=delta > 0) \
+            .add(Project, projects.get(comment.issue_id), "comment_count", delta, active=delta > 0)
+        comment.counted_issue_id = comment.issue_id
+    update.apply()
+
+
+def count_moved_comment(comment: Comment, using: str = "default"):
+    if comment.counted_issue_id == comment.issue_id:
+        return
+    projects = issue_projects((comment,), {comment.counted_issue_id, comment.issue_id}, using)
+    CounterUpdate(using) \
+        .add(Issue, comment.counted_issue_id, "comment_count", -1) \
+        .add(Project, projects.get(comment.counted_issue_id), "comment_count", -1) \
+        .add(Issue, comment.issue_id, "comment_count", active=True) \
+        .add(Project, projects.get(comment.issue_id), "comment_count", active=True) \
+        .apply()
+    comment.counted_issue_id = comment.issue_id
+
+
+def recounted(model: type[Model]) -> tuple[dict, Coalesce]:
+    """
+    Counters of `model` computed from the rows, and the time of its latest recorded
+    activity: creations and state changes leave no row behind, so the stored time is only
+    moved forward. Issue times must be repaired first, project times read them.
+    """
+    if model is Issue:
+        latest = Comment.objects.filter(issue=OuterRef("pk")).order_by("-created_time").values("created_time")
+        counts = {"comment_count": count_subquery(Comment.objects, "issue")}
+    else:
+        latest = Issue.objects.filter(project=OuterRef("pk")) \
+            .order_by("-last_activity_time").values("last_activity_time")
+        counts = {
+            **{field: count_subquery(Issue.objects.filter(state=state), "project")
+               for state, field in ISSUE_COUNT_FIELDS.items()},
+            "comment_count": count_subquery(Comment.objects, "issue__project"),
+        }
+    return counts, Coalesce(Subquery(latest[:1]), "last_activity_time")
+
+
+def repair(model: type[Model], using: str = "default", batch_size: int = 1000) -> list[int]:
+    """Recounts the rows of `model` whose counters drifted, returns their ids"""
+    counts, activity = recounted(model)
+    drifted: list[int] = list(
+        model.objects.using(using).exclude(Q(**counts) & Q(last_activity_time__gte=activity))
+        .values_list("pk", flat=True)
+    )
+    for start in range(0, len(drifted), batch_size):
+        model.objects.using(using).filter(pk__in=drifted[start:start + batch_size]) \
+            .update(**counts, last_activity_time=Greatest("last_activity_time", activity))
+    return drifted
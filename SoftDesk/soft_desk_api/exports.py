@@ -0,0 +1,50 @@
+from itertools import groupby
+from typing import Iterator
+from rest_framework.fields import DateTimeField
+from .models import Issue
+
+ISSUE_COLUMNS = {
+    "id": "id", "project": "project", "assigned_contributor": "assigned_contributor__user__username",
+    "author": "author", "state": "state", "priority": "priority", "label": "label",
+    "created_time": "created_time",
+}
+ISSUE_COUNTER_COLUMNS = {"comment_count": "comment_count", "last_activity_time": "last_activity_time"}
+COMMENT_COLUMNS = {
+    "id": "comments__id", "issue": "id", "author": "comments__author",
+    "description": "comments__description", "created_time": "comments__created_time",
+}
+CSV_HEADER = [f"issue_{name}" for name in (*ISSUE_COLUMNS, *ISSUE_COUNTER_COLUMNS)] \
+    + [f"comment_{name}" for name in COMMENT_COLUMNS]
+
+
+def iter_issues(project_id: int, chunk_size: int) -> Iterator[dict]:
+    """
+    Issues of the project with their comments, shaped as the Issue endpoint with
+    ?expand=comments, read in a single query (issues LEFT JOIN comments) streamed in chunks.
+    """
+    rows = Issue.objects.filter(project_id=project_id) \
+        .order_by("created_time", "id", "comments__created_time", "comments__id") \
+        .values(*ISSUE_COLUMNS.values(), *ISSUE_COUNTER_COLUMNS.values(),
+                *(column for column in COMMENT_COLUMNS.values() if column != "id")) \
+        .iterator(chunk_size)  # both orderings follow the (project|issue, created_time) indexes
+    datetime_field = DateTimeField()
+    for _, issue_rows in groupby(rows, key=lambda row: row["id"]):
+        first: dict = next(issue_rows)
+        issue = {name: first[column] for name, column in ISSUE_COLUMNS.items()}
+        issue["created_time"] = datetime_field.to_representation(issue["created_time"])
+        issue["comments"] = []
+        issue.update((name, first[column]) for name, column in ISSUE_COUNTER_COLUMNS.items())
+        issue["last_activity_time"] = datetime_field.to_representation(issue["last_activity_time"])
+        for row in (first, *issue_rows) if first["comments__id"] is not None else ():
+            comment = {name: row[column] for name, column in COMMENT_COLUMNS.items()}
+            comment["created_time"] = datetime_field.to_representation(comment["created_time"])
+            issue["comments"].append(comment)
+        yield issue
+
+
+def iter_csv_rows(issues: Iterator[dict]) -> Iterator[list]:
+    """One row per comment repeating its issue columns, one row per issue without comments"""
+    for issue in issues:
+        issue_values = [issue[name] for name in (*ISSUE_COLUMNS, *ISSUE_COUNTER_COLUMNS)]
+        for comment in issue["comments"] or [dict.fromkeys(COMMENT_COLUMNS)]:
+            yield issue_values + [comment[name] for name in COMMENT_COLUMNS]
@@ -1,19 +1,40 @@
-from rest_framework.serializers import Field, ValidationError
+from rest_framework.serializers import Field, PrimaryKeyRelatedField, ValidationError
 from .models import Contributor
 
 
 class ContributorField(Field):
+    """Contributor given by ID or username, read from the `lookup_cache` context when present"""
+
     def to_internal_value(self, data):
+        lookup_cache: dict | None = self.context.get("lookup_cache")
+        if lookup_cache is not None and (Contributor, str(data)) in lookup_cache:
+            return lookup_cache[(Contributor, str(data))]
         if isinstance(data, int) or data.isdigit():  # is int or str contains digit
             try:
-                return Contributor.objects.get(pk=int(data))
+                contributor = Contributor.objects.get(pk=int(data))
             except Contributor.DoesNotExist:
                 raise ValidationError(f"Contributor with ID {data} does not exist.")
         else:  # is str
             try:
-                return Contributor.objects.get(user__username=data)
+                contributor = Contributor.objects.get(user__username=data)
             except Contributor.DoesNotExist:
                 raise ValidationError(f"Contributor with username {data} does not exist.")
+        if lookup_cache is not None:
+            lookup_cache[(Contributor, str(data))] = contributor
+        return contributor
 
     def to_representation(self, value):
         return value.user.username
+
+
+class CachedPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField reading the `lookup_cache` context when present"""
+
+    def to_internal_value(self, data):
+        lookup_cache: dict | None = self.context.get("lookup_cache")
+        if lookup_cache is None:
+            return super().to_internal_value(data)
+        key = (self.get_queryset().model, str(data))
+        if key not in lookup_cache:
+            lookup_cache[key] = super().to_internal_value(data)
+        return lookup_cache[key]
@@ -0,0 +1,72 @@
+from django import forms
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from .models import Issue
+
+ORDERINGS: dict[str, tuple[str, ...]] = {
+    "created_time": ("created_time", "id"),
+    "-created_time": ("-created_time", "-id"),
+}
+
+
+class IssueFilterForm(forms.Form):
+    project = forms.IntegerField(required=False, min_value=1)
+    state = forms.ChoiceField(required=False, choices=Issue._meta.get_field("state").choices)
+    priority = forms.ChoiceField(required=False, choices=Issue._meta.get_field("priority").choices)
+    label = forms.ChoiceField(required=False, choices=Issue._meta.get_field("label").choices)
+    assigned_contributor = forms.IntegerField(required=False, min_value=1)
+    created_time_after = forms.DateTimeField(required=False)
+    created_time_before = forms.DateTimeField(required=False)
+    ordering = forms.ChoiceField(required=False, choices=[(name, name) for name in ORDERINGS])
+
+
+class IssueFilterBackend(BaseFilterBackend):
+    """
+    Filters of the Issue list, which already narrows to the caller's issues through the
+    (assigned_contributor, state) and (author, created_time) indexes: ?project= searches
+    the (project, created_time) index instead, ?state= the assignee index, created_time
+    bounds the author one and the other filters apply to the rows these searches return.
+    ?ordering= is restricted to created_time, the column the indexes are sorted on.
+    Invalid values answer 400.
+    """
+    lookups = {
+        "project": "project",
+        "state": "state",
+        "priority": "priority",
+        "label": "label",
+        "assigned_contributor": "assigned_contributor",
+        "created_time_after": "created_time__gte",
+        "created_time_before": "created_time__lte",
+    }
+
+    def filter_queryset(self, request, queryset: QuerySet, view) -> QuerySet:
+        if view.action != "list":
+            return queryset
+        form = IssueFilterForm(request.query_params)
+        if not form.is_valid():
+            raise ValidationError({field: list(messages) for field, messages in form.errors.items()})
+        queryset = queryset.filter(**{
+            self.lookups[name]: value for name, value in form.cleaned_data.items()
+            if name in self.lookups and value not in (None, "")
+        })
+        ordering: str = form.cleaned_data["ordering"]
+        if not ordering:
+            return queryset
+        cursor_ordering: tuple | None = getattr(view, "cursor_ordering", None)
+        if cursor_ordering is not None and view.paginator.cursor_query_param in request.query_params \
+                and ORDERINGS[ordering] != cursor_ordering:
+            raise ValidationError({"ordering": ["Cursor pages follow created_time: use their previous links."]})
+        return queryset.order_by(*ORDERINGS[ordering])
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        parameters = []
+        for name, field in IssueFilterForm.base_fields.items():
+            if isinstance(field, forms.ChoiceField):
+                schema = {"type": "string", "enum": [value for value, _ in field.choices if value]}
+            elif isinstance(field, forms.DateTimeField):
+                schema = {"type": "string", "format": "date-time"}
+            else:
+                schema = {"type": "integer"}
+            parameters.append({"name": name, "required": False, "in": "query", "schema": schema})
+        return parameters
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher running PASSWORD_ITERATIONS rounds, its own default when unset.
+    Same algorithm name: existing hashes still verify, and those made with another round
+    count are rehashed on the next successful login (must_update).
+    """
+
+    @property
+    def iterations(self) -> int:
+        return settings.PASSWORD_ITERATIONS or PBKDF2PasswordHasher.iterations
@@ -0,0 +1,125 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from ...models import Contributor, Project, Issue, Comment
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test of an endpoint: concurrent GETs served by WSGI worker threads, then by an ASGI "
+        "event loop on the synchronous and on the async (/api/async/) variant. The dataset is "
+        "committed, workers reading through their own connections, and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="Issue/", help="endpoint under /api/ and /api/async/")
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument(
+            "--latency", type=float, default=10, help="milliseconds added to each query, as over a network"
+        )
+        parser.add_argument("--projects", type=int, default=2)
+        parser.add_argument("--issues", type=int, default=5, help="issues per project")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive")
+        users: list[User] = self.seed(options["projects"], options["issues"])
+        headers = {"Authorization": f"Bearer {RefreshToken.for_user(users[0]).access_token}"}
+        latency: float = options["latency"] / 1000
+
+        def delay(execute, sql, params, many, context):
+            sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_latency(sender, connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        connection_created.connect(add_latency)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):  # the test clients' host
+                for name, run, prefix in (
+                    ("WSGI threads, sync views", self.run_wsgi, "/api/"),
+                    ("ASGI, sync views", self.run_asgi, "/api/"),
+                    ("ASGI, async views", self.run_asgi, "/api/async/"),
+                ):
+                    elapsed = run(prefix + options["path"], headers, options["requests"], options["concurrency"])
+                    self.stdout.write(
+                        f"{name}: {options['requests']} requests in {elapsed:.2f} s, "
+                        f"{options['requests'] / elapsed:.0f} req/s"
+                    )
+        finally:
+            connection_created.disconnect(add_latency)
+            Project.objects.filter(author__user__in=users).delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    @staticmethod
+    def urls(path: str, requests: int) -> list[str]:
+        # distinct query strings: every request misses the response cache of the sync views
+        separator = "&" if "?" in path else "?"
+        return [f"{path}{separator}request={index}" for index in range(requests)]
+
+    def run_wsgi(self, path: str, headers: dict, requests: int, concurrency: int) -> float:
+        def get(urls: list[str]):
+            client = Client(headers=headers)
+            try:
+                for url in urls:
+                    self.expect_ok(url, client.get(url))
+            finally:
+                connections.close_all()
+
+        urls = self.urls(path, requests)
+        start = perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(get, [urls[index::concurrency] for index in range(concurrency)]))
+        return perf_counter() - start
+
+    def run_asgi(self, path: str, headers: dict, requests: int, concurrency: int) -> float:
+        async def run() -> float:
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def get(url: str):
+                async with semaphore, ThreadSensitiveContext():  # as ASGIHandler does per request
+                    self.expect_ok(url, await client.get(url, headers=headers))
+
+            start = perf_counter()
+            await asyncio.gather(*(get(url) for url in self.urls(path, requests)))
+            return perf_counter() - start
+
+        return asyncio.run(run())
+
+    @staticmethod
+    def expect_ok(url: str, response):
+        if response.status_code != 200:
+            raise CommandError(f"{url} answered {response.status_code}: {response.content[:200]}")
+
+    @staticmethod
+    def seed(projects: int, issues: int) -> list[User]:
+        """A team of two: the first user authors the projects and is assigned their issues"""
+        offset: int = User.objects.count()
+        users = User.objects.bulk_create(User(username=f"benchmark{offset + index}") for index in range(2))
+        member, other = Contributor.objects.bulk_create(Contributor(user=user) for user in users)
+        created = Project.objects.bulk_create(
+            Project(name=f"benchmark {index}", author=member) for index in range(projects)
+        )
+        Project.contributors.through.objects.bulk_create(
+            Project.contributors.through(project=project, contributor=contributor)
+            for project in created for contributor in (member, other)
+        )
+        created_issues = Issue.objects.bulk_create(
+            Issue(project=project, author=other, assigned_contributor=member)
+            for project in created for _ in range(issues)
+        )
+        Comment.objects.bulk_create(
+            Comment(issue=issue, author=member, description="benchmark") for issue in created_issues
+        )
+        return users
@@ -0,0 +1,111 @@
+from statistics import median
+from time import perf_counter
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import QuerySet
+from django.test import Client, override_settings
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from ...models import Contributor, Project, Issue, Comment
+from ...serializers import ContributorTokenObtainPairSerializer
+from ...views import CommentViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the Comment list of contributors of a few to many projects: the previous "
+        "IN (subquery) + DISTINCT query, the viewset query and whole GET /api/Comment/ "
+        "requests, on a dataset rolled back afterwards. Relations render as ids (?expand=): "
+        "the embedded author would weigh its id lists, not the list query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--projects", type=int, default=10_000)
+        parser.add_argument("--issues", type=int, default=10, help="issues per project")
+        parser.add_argument("--comments", type=int, default=10, help="comments per issue")
+        parser.add_argument(
+            "--memberships", type=int, nargs="+", default=[10, 1000],
+            help="projects of each measured contributor",
+        )
+        parser.add_argument("--limit", type=int, default=100, help="page size")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if max(options["memberships"]) > options["projects"]:
+            raise CommandError("--memberships cannot exceed --projects")
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            start = perf_counter()
+            members: list[Contributor] = self.seed(options)
+            self.stdout.write(f"seeded {Comment.objects.count()} comments in {perf_counter() - start:.0f} s")
+            for contributor, memberships in zip(members, options["memberships"]):
+                previous: QuerySet = Comment.objects.filter(
+                    issue__project__id__in=contributor.projects_contribution.values_list("id", flat=True)
+                ).distinct().select_related("issue")
+                current: QuerySet = self.viewset_queryset(contributor)
+                self.stdout.write(f"member of {memberships} projects, {current.count()} visible comments:")
+                for name, queryset in (("IN + DISTINCT", previous), ("join", current)):
+                    page = self.time(lambda: list(queryset[:options["limit"]]), options["repeat"])
+                    count = self.time(queryset.count, options["repeat"])
+                    self.stdout.write(f"  {name}: page {page * 1000:.1f} ms, count {count * 1000:.1f} ms")
+                request = self.time_requests(contributor, options["limit"], options["repeat"])
+                self.stdout.write(f"  GET /api/Comment/: {request * 1000:.1f} ms")
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def time(function, repeat: int) -> float:
+        """Median of `repeat` calls, in seconds"""
+        timings: list[float] = []
+        for _ in range(repeat):
+            start = perf_counter()
+            function()
+            timings.append(perf_counter() - start)
+        return median(timings)
+
+    @staticmethod
+    def viewset_queryset(contributor: Contributor) -> QuerySet:
+        request = Request(APIRequestFactory().get("/api/Comment/?expand="))
+        request.user = contributor.user
+        return CommentViewSet(request=request, action="list", format_kwarg=None, args=(), kwargs={}).get_queryset()
+
+    def time_requests(self, contributor: Contributor, limit: int, repeat: int) -> float:
+        token = ContributorTokenObtainPairSerializer.get_token(contributor.user).access_token
+        client = Client(headers={"Authorization": f"Bearer {token}"})
+        timings: list[float] = []
+        for index in range(repeat):
+            # distinct query strings: every request misses the response and count caches
+            start = perf_counter()
+            response = client.get(f"/api/Comment/?expand=&limit={limit}&request={index}")
+            timings.append(perf_counter() - start)
+            if response.status_code != 200:
+                raise CommandError(f"/api/Comment/ answered {response.status_code}: {response.content[:200]}")
+        return median(timings)
+
+    @staticmethod
+    def seed(options: dict) -> list[Contributor]:
+        """One author of every project, and a member per --memberships value, spread over the projects"""
+        offset: int = User.objects.count()
+        users = User.objects.bulk_create(
+            User(username=f"benchmark{offset + index}") for index in range(1 + len(options["memberships"]))
+        )
+        author, *members = Contributor.objects.bulk_create(Contributor(user=user) for user in users)
+        projects = Project.objects.bulk_create(
+            Project(name=f"benchmark {index}", author=author) for index in range(options["projects"])
+        )
+        Project.contributors.through.objects.bulk_create(
+            Project.contributors.through(project=project, contributor=member)
+            for member, memberships in zip(members, options["memberships"])
+            for project in projects[::options["projects"] // memberships][:memberships]
+        )
+        issues = Issue.objects.bulk_create(
+            (Issue(project=project, author=author) for project in projects for _ in range(options["issues"])),
+            batch_size=10_000,
+        )
+        for start in range(0, len(issues), 1000):
+            Comment.objects.bulk_create(
+                (Comment(issue=issue, author=author, description="benchmark")
+                 for issue in issues[start:start + 1000] for _ in range(options["comments"])),
+                batch_size=10_000,
+            )
+        return members
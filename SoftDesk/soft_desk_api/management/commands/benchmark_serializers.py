@@ -0,0 +1,73 @@
+from time import perf_counter
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from ...models import Contributor, Project, Issue, Comment
+from ...representation import CompiledRepresentationMixin
+from ...serializers import ContributorSerializer, ProjectSerializer, IssueSerializer, CommentSerializer
+
+
+class Command(BaseCommand):
+    help = "Times list rendering with the compiled and the DRF read paths, on a dataset rolled back afterwards"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--projects", type=int, default=100)
+        parser.add_argument("--team-size", type=int, default=5)
+        parser.add_argument("--issues", type=int, default=5, help="issues per project")
+        parser.add_argument("--comments", type=int, default=3, help="comments per issue")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options)
+            for serializer_class in (ContributorSerializer, ProjectSerializer, IssueSerializer, CommentSerializer):
+                model = serializer_class.Meta.model
+                instances = list(serializer_class.setup_eager_loading(model.objects.all()))
+                compiled, compiled_time = self.render(serializer_class, instances, options["repeat"], True)
+                drf, drf_time = self.render(serializer_class, instances, options["repeat"], False)
+                if compiled != drf:
+                    raise CommandError(f"{serializer_class.__name__}: compiled output differs from DRF")
+                self.stdout.write(
+                    f"{serializer_class.__name__}: {len(instances)} rows, DRF {drf_time * 1000:.1f} ms, "
+                    f"compiled {compiled_time * 1000:.1f} ms, x{drf_time / compiled_time:.1f}"
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def render(serializer_class, instances: list, repeat: int, compiled: bool) -> tuple[bytes, float]:
+        """JSON of the list and best time of `repeat` serializations"""
+        CompiledRepresentationMixin.compiled_representation = compiled
+        try:
+            timings: list[float] = []
+            for _ in range(repeat):
+                start = perf_counter()
+                data = serializer_class(instances, many=True).data
+                timings.append(perf_counter() - start)
+            return JSONRenderer().render(data), min(timings)
+        finally:
+            CompiledRepresentationMixin.compiled_representation = True
+
+    @staticmethod
+    def seed(options: dict):
+        offset: int = User.objects.count()
+        users = User.objects.bulk_create(
+            User(username=f"benchmark{offset + index}") for index in range(options["projects"] + options["team_size"])
+        )
+        contributors = Contributor.objects.bulk_create(Contributor(user=user) for user in users)
+        projects = Project.objects.bulk_create(
+            Project(name=f"benchmark {index}", author=contributors[index]) for index in range(options["projects"])
+        )
+        Project.contributors.through.objects.bulk_create(
+            Project.contributors.through(project=project, contributor=contributor)
+            for index, project in enumerate(projects)
+            for contributor in {contributors[index], *contributors[-options["team_size"]:]}
+        )
+        issues = Issue.objects.bulk_create(
+            Issue(project=project, author=project.author, assigned_contributor=contributors[-1 - index % options["team_size"]])
+            for project in projects for index in range(options["issues"])
+        )
+        Comment.objects.bulk_create(
+            Comment(issue=issue, author=issue.assigned_contributor, description="benchmark")
+            for issue in issues for _ in range(options["comments"])
+        )
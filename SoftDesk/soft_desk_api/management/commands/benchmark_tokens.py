@@ -0,0 +1,50 @@
+from time import perf_counter
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from ...models import Contributor
+from ...serializers import ContributorTokenObtainPairSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Times token issuance (password check and JWT signing, as /api/token/ without its "
+        "throttles) per PBKDF2 round count, on a user rolled back afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=20)
+        parser.add_argument(
+            "--iterations", type=int, nargs="+",
+            help="PBKDF2 rounds to compare, Django's default and PASSWORD_ITERATIONS by default",
+        )
+
+    def handle(self, *args, **options):
+        rounds: list[int] = options["iterations"] or list(dict.fromkeys(
+            value for value in (PBKDF2PasswordHasher.iterations, settings.PASSWORD_ITERATIONS) if value
+        ))
+        with transaction.atomic():
+            user = User.objects.create(username=f"benchmark{User.objects.count()}")
+            Contributor.objects.create(user=user)
+            for iterations in rounds:
+                with override_settings(PASSWORD_ITERATIONS=iterations):
+                    user.set_password("benchmark password")
+                    user.save(update_fields=["password"])
+                    elapsed = self.run(user.username, options["logins"])
+                self.stdout.write(
+                    f"{iterations} rounds ({user.password.split('$')[0]}): {options['logins']} tokens in "
+                    f"{elapsed:.2f} s, {options['logins'] / elapsed:.1f}/s per worker"
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def run(username: str, logins: int) -> float:
+        start = perf_counter()
+        for _ in range(logins):
+            ContributorTokenObtainPairSerializer(
+                data={"username": username, "password": "benchmark password"}
+            ).is_valid(raise_exception=True)
+        return perf_counter() - start
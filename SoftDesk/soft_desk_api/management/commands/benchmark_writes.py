@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from ...models import Contributor, Project, Issue, Comment
+
+
+class Command(BaseCommand):
+    help = (
+        "Times concurrent comment inserts on throwaway SQLite databases, with the default "
+        "SQLite settings and with the PRAGMAS of the default database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--writes", type=int, default=200, help="transactions per thread")
+
+    def handle(self, *args, **options):
+        tuned: dict = connections["default"].settings_dict.get("PRAGMAS", {})
+        with TemporaryDirectory() as directory:
+            for profile, pragmas, database_options in (
+                ("default", {}, {}),
+                ("tuned", tuned, connections["default"].settings_dict.get("OPTIONS", {})),
+            ):
+                alias = f"benchmark_{profile}"
+                connections.settings[alias] = connections.configure_settings({
+                    "default": connections["default"].settings_dict,
+                    alias: {
+                        "ENGINE": "django.db.backends.sqlite3",
+                        "NAME": str(Path(directory) / f"{profile}.sqlite3"),
+                        "OPTIONS": database_options,
+                        "PRAGMAS": pragmas,
+                    },
+                })[alias]
+                try:
+                    call_command("migrate", database=alias, verbosity=0)
+                    self.report(profile, *self.run(alias, options["threads"], options["writes"]))
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+
+    def report(self, profile: str, elapsed: float, written: int, failed: int):
+        self.stdout.write(
+            f"{profile}: {written} transactions in {elapsed:.2f} s, {written / elapsed:.0f}/s, "
+            f"{failed} failed with 'database is locked'"
+        )
+
+    @staticmethod
+    def run(alias: str, threads: int, writes: int) -> tuple[float, int, int]:
+        # bulk_create sends no signals: the cache and project versions of the real database stay untouched
+        user = User.objects.using(alias).bulk_create([User(username="benchmark")])[0]
+        author = Contributor.objects.using(alias).bulk_create([Contributor(user=user)])[0]
+        project = Project.objects.using(alias).bulk_create([Project(name="benchmark", author=author)])[0]
+        issue = Issue.objects.using(alias).bulk_create([Issue(project=project, author=author)])[0]
+
+        def write(_) -> tuple[int, int]:
+            written = failed = 0
+            try:
+                for _ in range(writes):
+                    try:
+                        with transaction.atomic(using=alias):
+                            Comment.objects.using(alias).bulk_create(
+                                [Comment(issue=issue, author=author, description="benchmark")]
+                            )
+                        written += 1
+                    except OperationalError:
+                        failed += 1
+            finally:
+                connections[alias].close()  # one connection per thread
+            return written, failed
+
+        start = perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            results = list(executor.map(write, range(threads)))
+        return perf_counter() - start, sum(result[0] for result in results), sum(result[1] for result in results)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from ...counters import repair
+from ...models import Project, Issue
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the issue, comment and last activity counters of issues and projects "
+        "from the rows, and rewrites those that drifted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--dry-run", action="store_true", help="report the drifted rows, change nothing")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        using: str = options["database"]
+        with transaction.atomic(using=using):
+            issue_ids: list[int] = repair(Issue, using, options["batch_size"])  # project times read them
+            project_ids: list[int] = repair(Project, using, options["batch_size"])
+            if options["dry_run"]:
+                transaction.set_rollback(True, using=using)
+            else:
+                for start in range(0, max(len(issue_ids), len(project_ids)), options["batch_size"]):
+                    stop = start + options["batch_size"]
+                    Project.objects.using(using).filter(pk__in=project_ids[start:stop]).touch()
+                    Project.objects.using(using).filter(issues__in=issue_ids[start:stop]).touch()
+        verb = "drifted" if options["dry_run"] else "repaired"
+        self.stdout.write(f"{len(issue_ids)} issues and {len(project_ids)} projects {verb}")
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('soft_desk_api', '0004_project_version'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ['created_time', 'id']},
+        ),
+        migrations.AlterModelOptions(
+            name='issue',
+            options={'ordering': ['created_time', 'id']},
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='issue',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='soft_desk_api.issue'),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='assigned_contributor',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_issues', to='soft_desk_api.contributor'),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='author',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='authored_issues', to='soft_desk_api.contributor'),
+        ),
+        migrations.AlterField(
+            model_name='issue',
+            name='project',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='issues', to='soft_desk_api.project'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['issue', 'created_time'], name='soft_desk_a_issue_i_68bb58_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['project', 'created_time'], name='soft_desk_a_project_50baf4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['assigned_contributor', 'state'], name='soft_desk_a_assigne_e5a45f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['author', 'created_time'], name='soft_desk_a_author__d3b977_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# SQLite: FTS5 tables keyed by the row id, maintained by signals.py
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE soft_desk_api_project_fts USING fts5(name, description, tokenize='porter unicode61')",
+    "INSERT INTO soft_desk_api_project_fts (rowid, name, description) "
+    "SELECT id, name, description FROM soft_desk_api_project",
+    "CREATE VIRTUAL TABLE soft_desk_api_comment_fts USING fts5(description, tokenize='porter unicode61')",
+    "INSERT INTO soft_desk_api_comment_fts (rowid, description) "
+    "SELECT id, description FROM soft_desk_api_comment",
+]
+SQLITE_BACKWARD = [
+    "DROP TABLE soft_desk_api_project_fts",
+    "DROP TABLE soft_desk_api_comment_fts",
+]
+
+# PostgreSQL: GIN indexes on the expressions search.py matches, maintained by the database
+POSTGRES_FORWARD = [
+    "CREATE INDEX soft_desk_api_project_search ON soft_desk_api_project "
+    "USING gin (to_tsvector('english', name || ' ' || description))",
+    "CREATE INDEX soft_desk_api_comment_search ON soft_desk_api_comment "
+    "USING gin (to_tsvector('english', description))",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX soft_desk_api_project_search",
+    "DROP INDEX soft_desk_api_comment_search",
+]
+
+
+def run_for_vendor(sqlite: list[str], postgresql: list[str]):
+    def run(apps, schema_editor):
+        for statement in {"sqlite": sqlite, "postgresql": postgresql}.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('soft_desk_api', '0005_issue_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(SQLITE_FORWARD, POSTGRES_FORWARD),
+            run_for_vendor(SQLITE_BACKWARD, POSTGRES_BACKWARD),
+        ),
+    ]
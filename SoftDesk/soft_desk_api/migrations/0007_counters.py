@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:31
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def count(queryset, field):
+    counted = queryset.filter(**{field: OuterRef("pk")}).order_by().values(field)
+    return Coalesce(Subquery(counted.annotate(count=Count("*")).values("count"), output_field=models.IntegerField()), 0)
+
+
+def latest(queryset, field, time_field):
+    rows = queryset.filter(**{field: OuterRef("pk")}).order_by(f"-{time_field}").values(time_field)
+    return Greatest("created_time", Coalesce(Subquery(rows[:1]), "created_time"))
+
+
+def count_existing_rows(apps, schema_editor):
+    Project = apps.get_model("soft_desk_api", "Project")
+    Issue = apps.get_model("soft_desk_api", "Issue")
+    Comment = apps.get_model("soft_desk_api", "Comment")
+    Issue.objects.using(schema_editor.connection.alias).update(
+        comment_count=count(Comment.objects, "issue"),
+        last_activity_time=latest(Comment.objects, "issue", "created_time"),
+    )
+    Project.objects.using(schema_editor.connection.alias).update(
+        todo_issue_count=count(Issue.objects.filter(state="TO DO"), "project"),
+        in_progress_issue_count=count(Issue.objects.filter(state="In Progress"), "project"),
+        finished_issue_count=count(Issue.objects.filter(state="Finished"), "project"),
+        comment_count=count(Comment.objects, "issue__project"),
+        last_activity_time=latest(Issue.objects, "project", "last_activity_time"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('soft_desk_api', '0006_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='last_activity_time',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='comment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='finished_issue_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_issue_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='last_activity_time',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='todo_issue_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing_rows, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,59 @@
 from django.db.models import Model, SET_NULL, CASCADE, ForeignKey, ManyToManyField, \
-    OneToOneField, CharField, PositiveSmallIntegerField, BooleanField, DateTimeField
+    OneToOneField, CharField, PositiveSmallIntegerField, BooleanField, DateTimeField, \
+    QuerySet, Count, OuterRef, Subquery, IntegerField, PositiveBigIntegerField, F, Q, Index
+from django.db import router, transaction
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
 from django.contrib.auth.models import User
 
 
+def count_subquery(queryset: QuerySet, field: str) -> Coalesce:
+    """Correlated COUNT(*) of the `queryset` rows whose `field` is the outer primary key"""
+    counted = queryset.filter(**{field: OuterRef("pk")}).order_by().values(field)
+    return Coalesce(
+        Subquery(counted.annotate(count=Count("*")).values("count"), output_field=IntegerField()), 0
+    )
+
+
+class ContributorQuerySet(QuerySet):
+    def with_statistics(self, *names: str) -> QuerySet:
+        """Annotates the counts read by the statistics properties (all by default), in the same query"""
+        statistics = {
+            "project_contributions": lambda: count_subquery(Project.contributors.through.objects, "contributor"),
+            "issue_contributions": lambda: count_subquery(Issue.objects, "assigned_contributor"),
+            "comments": lambda: count_subquery(Comment.objects, "author"),
+        }
+        return self.annotate(**{
+            f"{name}_count": subquery() for name, subquery in statistics.items() if not names or name in names
+        })
+
+
+class ProjectQuerySet(QuerySet):
+    def touch(self) -> int:
+        """Bumps the version and modification time behind the ETag / Last-Modified headers"""
+        return self.update(version=F("version") + 1, updated_time=now())
+
+
+class CountedModel(Model):
+    """
+    Rows carrying columns only F() updates change, the denormalised counters of counters.py
+    and the project version: saving a loaded instance writes every other field, never the
+    values it was loaded with, which a concurrent increment may have outdated.
+    """
+    counter_fields: tuple[str, ...] = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get("force_insert") and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
 class Contributor(Model):
     user = OneToOneField(User, on_delete=CASCADE, related_name="contributor")
     age = PositiveSmallIntegerField(default=18)
@@ -10,27 +61,35 @@ class Contributor(Model):
     can_data_be_shared = BooleanField(default=False)
     is_staff = False
 
+    objects = ContributorQuerySet.as_manager()
+
     @property
     def username(self):
         return self.user.username
 
     @property
     def project_contributions(self):
+        if hasattr(self, "project_contributions_count"):
+            return self.project_contributions_count
         return self.projects_contribution.all().count()
 
     @property
     def issue_contributions(self):
+        if hasattr(self, "issue_contributions_count"):
+            return self.issue_contributions_count
         return self.assigned_issues.all().count()
 
     @property
     def comments(self):
+        if hasattr(self, "comments_count"):
+            return self.comments_count
         return self.authored_comments.all().count()
 
     def __str__(self):
         return self.username
 
 
-class Project(Model):
+class Project(CountedModel):
     name = CharField(max_length=100)
     description = CharField(max_length=500, blank=True)
     author = ForeignKey(to=Contributor, on_delete=SET_NULL,
@@ -40,16 +99,31 @@ class Project(Model):
         ("BE", "Back-End"), ("FE", "Front-End"), ("IOS", "iOS"), ("AND", "Android"),
     ])
     created_time = DateTimeField(auto_now_add=True)
+    version = PositiveBigIntegerField(default=1, editable=False)
+    updated_time = DateTimeField(auto_now=True)
+    # denormalised counters, see counters.py
+    todo_issue_count = IntegerField(default=0, editable=False)
+    in_progress_issue_count = IntegerField(default=0, editable=False)
+    finished_issue_count = IntegerField(default=0, editable=False)
+    comment_count = IntegerField(default=0, editable=False)
+    last_activity_time = DateTimeField(default=now, editable=False)
+    counter_fields = (
+        "version",  # bumped by touch() only: a stale save must not re-serve an ETag
+        "todo_issue_count", "in_progress_issue_count", "finished_issue_count", "comment_count", "last_activity_time",
+    )
+
+    objects = ProjectQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
 
-class Issue(Model):
-    project = ForeignKey(to=Project, on_delete=CASCADE, related_name="issues")
-    assigned_contributor = ForeignKey(to=Contributor, on_delete=SET_NULL,
+class Issue(CountedModel):
+    # foreign keys are indexed by the composite Meta.indexes they lead
+    project = ForeignKey(to=Project, on_delete=CASCADE, related_name="issues", db_index=False)
+    assigned_contributor = ForeignKey(to=Contributor, on_delete=SET_NULL, db_index=False,
                                       related_name="assigned_issues", null=True, blank=True)
-    author = ForeignKey(to=Contributor, on_delete=SET_NULL,
+    author = ForeignKey(to=Contributor, on_delete=SET_NULL, db_index=False,
                         related_name="authored_issues", null=True)
     state = CharField(max_length=100, default="TO DO", choices=[
         ("TO DO", "TO DO"), ("In Progress", "In Progress"), ("Finished", "Finished"),
@@ -61,17 +135,86 @@ class Issue(Model):
         ("BUG", "BUG"), ("FEATURE", "FEATURE"), ("TASK", "TASK"),
     ])
     created_time = DateTimeField(auto_now_add=True)
+    # denormalised counters, see counters.py
+    comment_count = IntegerField(default=0, editable=False)
+    last_activity_time = DateTimeField(default=now, editable=False)
+    counter_fields = ("comment_count", "last_activity_time")
+
+    class Meta:
+        ordering = ["created_time", "id"]
+        indexes = [
+            Index(fields=["project", "created_time"]),  # project pages, exports, Comment joins
+            Index(fields=["assigned_contributor", "state"]),  # Issue list, by assignee and state
+            Index(fields=["author", "created_time"]),  # Issue list, by author
+        ]
 
     def __str__(self):
         return f"[{self.project}] {self.label} : {self.priority}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        issue = super().from_db(db, field_names, values)
+        if "project_id" in field_names and "state" in field_names:
+            issue.counted_as = (issue.project_id, issue.state)  # where the project counters include it
+        return issue
+
+    def save(self, *args, **kwargs):
+        """Atomic with the counter updates of its post_save receivers"""
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(Issue, instance=self),
+                                savepoint=False):
+            super().save(*args, **kwargs)
+
 
 class Comment(Model):
-    issue = ForeignKey(to=Issue, on_delete=CASCADE, related_name="comments")
+    issue = ForeignKey(to=Issue, on_delete=CASCADE, related_name="comments", db_index=False)
     author = ForeignKey(to=Contributor, on_delete=SET_NULL,
                         related_name="authored_comments", null=True)
     description = CharField(max_length=3000)
     created_time = DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ["created_time", "id"]
+        indexes = [
+            Index(fields=["issue", "created_time"]),  # Comment list and nested comments, in order
+        ]
+
     def __str__(self):
         return f"[{self.author}] {self.issue}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        comment = super().from_db(db, field_names, values)
+        if "issue_id" in field_names:
+            comment.counted_issue_id = comment.issue_id  # where the issue counters include it
+        return comment
+
+    def save(self, *args, **kwargs):
+        """Atomic with the counter updates of its post_save receivers"""
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(Comment, instance=self),
+                                savepoint=False):
+            super().save(*args, **kwargs)
+
+
+def touch_projects(*instances: Model):
+    """
+    Bumps the version of every project whose payload embeds one of these instances:
+    the project itself, the project of an issue or comment, and the projects a
+    contributor authors or contributes to (they nest the contributor's id lists).
+    """
+    project_ids, issue_ids, contributor_ids = set(), set(), set()
+    for instance in instances:
+        if isinstance(instance, Project):
+            project_ids.add(instance.pk)
+        elif isinstance(instance, Issue):
+            project_ids.add(instance.project_id)
+            contributor_ids |= {instance.author_id, instance.assigned_contributor_id}
+        elif isinstance(instance, Comment):
+            issue_ids.add(instance.issue_id)
+            contributor_ids.add(instance.author_id)
+        elif isinstance(instance, Contributor):
+            contributor_ids.add(instance.pk)
+    contributor_ids.discard(None)
+    Project.objects.filter(
+        Q(pk__in=project_ids) | Q(issues__in=issue_ids)
+        | Q(contributors__in=contributor_ids) | Q(author__in=contributor_ids)
+    ).touch()
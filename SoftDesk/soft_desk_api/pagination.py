@@ -1,8 +1,203 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from hashlib import md5
+from json import dumps, loads
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .caching import aget_version, bump_version, get_version, now_and_on_commit
+from .routers import replica_cache_timeout
+
+
+def invalidate_counts(*models: type[Model]):
+    """Expires every cached count computed over the given models, again once the write commits"""
+    now_and_on_commit(bump_version, *(f"count:{model._meta.label_lower}" for model in models))
+
+
+def estimate_count(queryset: QuerySet) -> int | None:
+    """Planner row estimate of the query, on backends exposing one"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        return int(cursor.fetchone()[0][0]["Plan"]["Plan Rows"])
 
 
 class CustomLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Limit/offset by default. Views declaring `cursor_ordering` also accept `?cursor=`
+    (empty for the first page): keyset pagination on that ordering, without COUNT(*)
+    unless `?count=true` is given, in the same response envelope.
+
+    Counts are cached per user, endpoint and filter parameters for `count_cache_timeout`
+    seconds (no longer than the replica lag when read from the replica), until the
+    listed model changes. Beyond `estimated_count_threshold` rows, the planner estimate
+    is reported instead, flagged by the X-Count-Estimated header.
+    """
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+    count_cache_timeout = 60
+    estimated_count_threshold = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.start_cursor_mode(request, view):
+            return super().paginate_queryset(queryset, request, view)
+        if self.count_requested(request):
+            self.count = self.get_count(queryset)
+        page, position, reverse = self.get_cursor_page(queryset, request)
+        return self.end_cursor_page(list(page), position, reverse)
+
+    async def apaginate_queryset(self, queryset: QuerySet, request, view=None) -> list | None:
+        """paginate_queryset on the async ORM"""
+        if self.start_cursor_mode(request, view):
+            if self.count_requested(request):
+                self.count = await self.aget_count(queryset)
+            page, position, reverse = self.get_cursor_page(queryset, request)
+            return self.end_cursor_page([obj async for obj in page], position, reverse)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.count = await self.aget_count(queryset)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [obj async for obj in queryset[self.offset:self.offset + self.limit]]
+
+    def start_cursor_mode(self, request, view) -> bool:
+        self.count_is_estimated = False
+        self.ordering: tuple | None = getattr(view, "cursor_ordering", None)
+        self.cursor_mode = self.ordering is not None and self.cursor_query_param in request.query_params
+        if self.cursor_mode:
+            self.request = request
+            self.limit = self.get_limit(request)
+            self.offset = None
+            self.count = None
+        return self.cursor_mode
+
+    def count_requested(self, request) -> bool:
+        return request.query_params.get(self.count_query_param, "").lower() in ("1", "true")
+
+    def get_cursor_page(self, queryset: QuerySet, request) -> tuple[QuerySet, list | None, bool]:
+        """Unevaluated query of the page after the cursor, one row longer to tell if another follows"""
+        position, reverse = self.decode_cursor(queryset, request)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position, "lt" if reverse else "gt"))
+        ordering = [f"-{field}" for field in self.ordering] if reverse else self.ordering
+        return queryset.order_by(*ordering)[:self.limit + 1], position, reverse
+
+    def end_cursor_page(self, rows: list, position: list | None, reverse: bool) -> list:
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.first_position = self.get_position(rows[0]) if rows else position
+        self.last_position = self.get_position(rows[-1]) if rows else position
+        return rows
+
+    def get_count(self, queryset):
+        if not isinstance(queryset, QuerySet) or not self.count_cache_timeout:
+            return self.compute_count(queryset)
+        key = self.get_count_cache_key(queryset, get_version(f"count:{queryset.model._meta.label_lower}"))
+        cached = cache.get(key)
+        if cached is None:
+            cached = (self.compute_count(queryset), self.count_is_estimated)
+            cache.set(key, cached, replica_cache_timeout(self.count_cache_timeout))
+        count, self.count_is_estimated = cached
+        return count
+
+    async def aget_count(self, queryset: QuerySet) -> int:
+        if not self.count_cache_timeout:
+            return await sync_to_async(self.compute_count)(queryset)
+        key = self.get_count_cache_key(queryset, await aget_version(f"count:{queryset.model._meta.label_lower}"))
+        cached = await cache.aget(key)
+        if cached is None:
+            cached = (await sync_to_async(self.compute_count)(queryset), self.count_is_estimated)
+            await cache.aset(key, cached, replica_cache_timeout(self.count_cache_timeout))
+        count, self.count_is_estimated = cached
+        return count
+
+    def compute_count(self, queryset) -> int:
+        threshold = self.estimated_count_threshold
+        if threshold is not None and isinstance(queryset, QuerySet) \
+                and queryset.order_by()[:threshold + 1].count() > threshold:
+            estimate = estimate_count(queryset)
+            if estimate is not None:
+                self.count_is_estimated = True
+                return max(estimate, threshold + 1)
+        return super().get_count(queryset)
+
+    def get_count_cache_key(self, queryset: QuerySet, version: int) -> str:
+        paging_params = (self.limit_query_param, self.offset_query_param,
+                         self.cursor_query_param, self.count_query_param)
+        filters = sorted(
+            (name, value) for name, values in self.request.query_params.lists()
+            if name not in paging_params for value in values
+        )
+        digest = md5(dumps([self.request.path, filters]).encode()).hexdigest()
+        return f"count:{queryset.model._meta.label_lower}:{version}:{self.request.user.pk}:{digest}"
+
+    def keyset_filter(self, position: list, lookup: str) -> Q:
+        """Rows strictly after (gt) or before (lt) `position` in the cursor ordering"""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            ties = {name: value for name, value in zip(self.ordering[:index], position)}
+            condition |= Q(**ties, **{f"{field}__{lookup}": position[index]})
+        return condition
+
+    def get_position(self, obj) -> list:
+        return [getattr(obj, field) for field in self.ordering]
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        payload = dumps({"p": [str(value) for value in position], "r": reverse})
+        return urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, queryset: QuerySet, request) -> tuple[list | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = loads(urlsafe_b64decode(encoded.encode()))
+            fields = [queryset.model._meta.get_field(field) for field in self.ordering]
+            position = [field.to_python(value) for field, value in zip(fields, payload["p"], strict=True)]
+            return position, bool(payload["r"])
+        except (BinasciiError, UnicodeDecodeError, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.last_position, reverse=False)
+        )
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.first_position, reverse=True)
+        )
 
     def get_paginated_response(self, data):
         return Response({
@@ -12,4 +207,25 @@ class CustomLimitOffsetPagination(LimitOffsetPagination):
             "previous": self.get_previous_link(),
             "next": self.get_next_link(),
             "results": data
-        })
+        }, headers={"X-Count-Estimated": "true"} if self.count_is_estimated else None)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        if getattr(view, "cursor_ordering", None) is not None:
+            parameters += [
+                {
+                    "name": self.cursor_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Opaque keyset cursor, empty for the first page.",
+                    "schema": {"type": "string"},
+                },
+                {
+                    "name": self.count_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": "Compute the total count in cursor mode.",
+                    "schema": {"type": "boolean"},
+                },
+            ]
+        return parameters
@@ -1,19 +1,74 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from .models import Project, Issue, Comment
 
+PROJECT_IDS_CACHE_TIMEOUT = 300
+
+
+def project_ids_cache_key(contributor_id: int) -> str:
+    return f"project-ids:{contributor_id}"
+
+
+def get_project_ids(request) -> frozenset[int]:
+    """
+    Ids of the projects the caller contributes to, loaded once per request and shared
+    across requests through the cache until their membership changes. Read from the
+    primary: a lagging replica would cache a revoked membership again.
+    """
+    if not hasattr(request, "_project_ids"):
+        contributor_id: int = request.user.contributor.id
+        key = project_ids_cache_key(contributor_id)
+        project_ids = cache.get(key)
+        if project_ids is None:
+            project_ids = frozenset(
+                Project.contributors.through.objects.using(DEFAULT_DB_ALIAS).filter(contributor_id=contributor_id)
+                .values_list("project_id", flat=True)
+            )
+            cache.set(key, project_ids, PROJECT_IDS_CACHE_TIMEOUT)
+        request._project_ids = project_ids
+    return request._project_ids
+
+
+async def aget_project_ids(request) -> frozenset[int]:
+    """get_project_ids on the async ORM"""
+    if not hasattr(request, "_project_ids"):
+        contributor_id: int = request.user.contributor.id
+        key = project_ids_cache_key(contributor_id)
+        project_ids = await cache.aget(key)
+        if project_ids is None:
+            project_ids = frozenset([
+                project_id async for project_id in Project.contributors.through.objects.using(DEFAULT_DB_ALIAS)
+                .filter(contributor_id=contributor_id).values_list("project_id", flat=True)
+            ])
+            await cache.aset(key, project_ids, PROJECT_IDS_CACHE_TIMEOUT)
+        request._project_ids = project_ids
+    return request._project_ids
+
+
+def is_contributor(contributor_id: int, project_id: int) -> bool:
+    """Single EXISTS lookup on the membership table"""
+    return Project.contributors.through.objects.filter(
+        project_id=project_id, contributor_id=contributor_id
+    ).exists()
+
+
+def invalidate_project_ids(*contributor_ids: int):
+    cache.delete_many([project_ids_cache_key(contributor_id) for contributor_id in contributor_ids])
+
 
 class IsContributorOrOwner(BasePermission):
     def has_object_permission(self, request, view, obj):
         """Permission for /endpoint/{id}"""
         if request.method in SAFE_METHODS:
             if isinstance(obj, Project):
-                return request.user.contributor in obj.contributors.all()
+                return obj.id in get_project_ids(request)
             if isinstance(obj, Issue):
-                return request.user.contributor in obj.project.contributors.all()
+                return obj.project_id in get_project_ids(request)
             if isinstance(obj, Comment):
-                return request.user.contributor in obj.issue.project.contributors.all()
+                return obj.issue.project_id in get_project_ids(request)
         else:
-            return request.user.contributor == obj.author
+            return obj.author_id == request.user.contributor.id
 
 
 class IsOwnerOrReadOnly(BasePermission):
@@ -0,0 +1,86 @@
+from csv import writer
+from typing import Iterable, Iterator
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:  # optional, rendering falls back to the stdlib encoder
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when installed, to the same JSON values as DRF:
+    only floats may be spelled differently (1e-6 for 1e-06, 1e16 for 1e+16), and
+    non-finite ones render as null where DRF refuses them. Data orjson cannot encode
+    (integers beyond 64 bits), indented, ASCII-only or non-compact output, and installs
+    without orjson, use the stdlib encoder of the parent class.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or not (api_settings.UNICODE_JSON and api_settings.COMPACT_JSON) \
+                or self.get_indent(accepted_media_type or "", renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret: bytes = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:  # orjson.JSONEncodeError
+            return super().render(data, accepted_media_type, renderer_context)
+        # same escaping as JSONRenderer, for JavaScript compatibility
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+def stream_json(items: Iterable, renderer: JSONRenderer) -> Iterator[bytes]:
+    """Encodes `items` as a JSON array, one element at a time"""
+    yield b"["
+    for index, item in enumerate(items):
+        yield b"," + renderer.render(item) if index else renderer.render(item)
+    yield b"]"
+
+
+def stream_ndjson(items: Iterable, renderer: JSONRenderer) -> Iterator[bytes]:
+    """Encodes `items` as newline-delimited JSON, one element per line"""
+    for item in items:
+        yield renderer.render(item) + b"\n"
+
+
+class Echo:
+    """File-like object handing back what csv.writer writes"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def stream_csv(header: list[str], rows: Iterable[list]) -> Iterator[str]:
+    """Encodes `rows` as CSV lines under `header`"""
+    csv_writer = writer(Echo())
+    yield csv_writer.writerow(header)
+    for row in rows:
+        yield csv_writer.writerow(row)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Selected by ?format=ndjson, renders non-streamed answers (errors) as one JSON line"""
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b"".join(stream_ndjson([data], FastJSONRenderer())) if data is not None else b""
+
+
+class CSVRenderer(BaseRenderer):
+    """Selected by ?format=csv, renders non-streamed answers (errors) as a one-row table"""
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict):
+            return b""
+        return "".join(stream_csv(list(data), [[str(value) for value in data.values()]])).encode()
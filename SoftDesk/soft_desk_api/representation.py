@@ -0,0 +1,81 @@
+from copy import deepcopy
+from operator import attrgetter
+from typing import Callable
+from rest_framework.fields import BooleanField, CharField, IntegerField, ReadOnlyField
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+from rest_framework.serializers import SerializerMethodField
+
+# (field name, getter(serializer, instance), converter applied to non-None values or None)
+FieldPlan = list[tuple[str, Callable, Callable | None]]
+
+# exact DRF field classes whose to_representation() is a plain cast
+CASTS: dict[type, Callable | None] = {ReadOnlyField: None, CharField: str, IntegerField: int, BooleanField: bool}
+
+plans: dict[tuple, FieldPlan | None] = {}
+
+
+def compile_field(serializer, field) -> tuple[Callable, Callable | None] | None:
+    """Getter and converter reproducing `field` output, None when not supported"""
+    if isinstance(field, SerializerMethodField):
+        method_name: str = field.method_name
+        return lambda bound, instance: getattr(bound, method_name)(instance), None
+    if len(field.source_attrs) != 1:
+        return None
+    source: str = field.source_attrs[0]
+    if isinstance(field, ManyRelatedField):
+        if type(field.child_relation) is not PrimaryKeyRelatedField or field.child_relation.pk_field:
+            return None
+        get_pk = attrgetter(serializer.Meta.model._meta.get_field(source).related_model._meta.pk.attname)
+        return lambda bound, instance: list(map(get_pk, getattr(instance, source).all())), None
+    if isinstance(field, PrimaryKeyRelatedField):
+        if field.pk_field is not None:
+            return None
+        get_id = attrgetter(serializer.Meta.model._meta.get_field(source).attname)  # the FK column
+        return lambda bound, instance: get_id(instance), None
+    if isinstance(field, RelatedField):
+        return None
+    get_value = attrgetter(source)
+    if type(field) in CASTS:
+        return lambda bound, instance: get_value(instance), CASTS[type(field)]
+    # an unbound copy: the cached plan must not keep the serializer, its instance and request alive
+    return lambda bound, instance: get_value(instance), deepcopy(field).to_representation
+
+
+def compile_plan(serializer) -> FieldPlan | None:
+    plan: FieldPlan = []
+    for field in serializer._readable_fields:
+        compiled = compile_field(serializer, field)
+        if compiled is None:
+            return None
+        plan.append((field.field_name, *compiled))
+    return plan
+
+
+class CompiledRepresentationMixin:
+    """
+    Read path skipping the per-field machinery of Serializer.to_representation: the readable
+    fields are compiled once per serializer class and field selection into plain getters and
+    casts, producing the same output. Serializers with a field the plan does not support,
+    or with `compiled_representation` off, fall back to DRF.
+    Compiled fields must not depend on the serializer context.
+    """
+    compiled_representation = True
+
+    def get_plan(self) -> FieldPlan | None:
+        if not hasattr(self, "_plan"):
+            # keyed on the fields actually rendered: unknown ?fields= names add no entry
+            key = (type(self), frozenset(field.field_name for field in self._readable_fields))
+            if key not in plans:
+                plans[key] = compile_plan(self)
+            self._plan = plans[key]
+        return self._plan
+
+    def to_representation(self, instance):
+        plan = self.get_plan() if self.compiled_representation else None
+        if plan is None:
+            return super().to_representation(instance)
+        ret = {}
+        for name, getter, convert in plan:
+            value = getter(self, instance)
+            ret[name] = value if value is None or convert is None else convert(value)
+        return ret
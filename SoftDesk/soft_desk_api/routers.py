@@ -0,0 +1,58 @@
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# set by ReplicaReadMixin around the list/retrieve actions of the viewsets
+replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+
+def primary_pin_key(user_id) -> str:
+    return f"primary-pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """Reads of this user skip the replica for REPLICA_PIN_SECONDS, so they see their own writes"""
+    cache.set(primary_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id) -> bool:
+    return cache.get(primary_pin_key(user_id), False)
+
+
+async def ais_pinned_to_primary(user_id) -> bool:
+    return await cache.aget(primary_pin_key(user_id), False)
+
+
+def reads_replica() -> bool:
+    return replica_reads.get() and bool(settings.REPLICA_DATABASE)
+
+
+def replica_cache_timeout(timeout: int) -> int:
+    """
+    Timeout of a cache entry filled by the current reads: from the replica, it may hold
+    rows the primary already invalidated, so it lasts no longer than the replication lag
+    the read-your-writes pin allows for (REPLICA_PIN_SECONDS).
+    """
+    return min(timeout, settings.REPLICA_PIN_SECONDS) if reads_replica() else timeout
+
+
+class ReplicaRouter:
+    """
+    Reads inside `replica_reads` go to the REPLICA_DATABASE alias when one is configured,
+    everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reads_replica():
+            return settings.REPLICA_DATABASE
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS  # also for instances read from the replica
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Both databases hold the same rows"""
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE}:
+            return True
+        return None
@@ -0,0 +1,118 @@
+"""
+Full-text search over project names and descriptions and comment descriptions, through
+the indexes of migration 0006: FTS5 tables on SQLite, kept in sync by signals.py, and
+GIN expression indexes on PostgreSQL, maintained by the database itself.
+"""
+import re
+from django.db import NotSupportedError, connections, router
+from django.db.models import Model, QuerySet
+from .models import Project, Issue, Comment
+
+MAX_TERMS = 16
+
+SEARCH_FIELDS: dict[type[Model], tuple[str, ...]] = {
+    Project: ("name", "description"),
+    Comment: ("description",),
+}
+
+MEMBERSHIP_TABLE: str = Project.contributors.through._meta.db_table
+
+SQLITE_HITS = f"""
+    SELECT 'project' AS type, fts.rowid AS id, fts.rowid AS project, NULL AS issue,
+           -bm25(soft_desk_api_project_fts) AS rank
+    FROM soft_desk_api_project_fts AS fts
+    JOIN {MEMBERSHIP_TABLE} AS member ON member.project_id = fts.rowid
+    WHERE soft_desk_api_project_fts MATCH %s AND member.contributor_id = %s
+    UNION ALL
+    SELECT 'comment', comment.id, issue.project_id, comment.issue_id, -bm25(soft_desk_api_comment_fts)
+    FROM soft_desk_api_comment_fts AS fts
+    JOIN {Comment._meta.db_table} AS comment ON comment.id = fts.rowid
+    JOIN {Issue._meta.db_table} AS issue ON issue.id = comment.issue_id
+    JOIN {MEMBERSHIP_TABLE} AS member ON member.project_id = issue.project_id
+    WHERE soft_desk_api_comment_fts MATCH %s AND member.contributor_id = %s
+"""
+
+# the to_tsvector() expressions are those of the GIN indexes
+POSTGRES_HITS = f"""
+    SELECT 'project' AS type, project.id, project.id AS project, NULL::integer AS issue,
+           ts_rank(to_tsvector('english', project.name || ' ' || project.description), query) AS rank
+    FROM {Project._meta.db_table} AS project
+    JOIN {MEMBERSHIP_TABLE} AS member ON member.project_id = project.id,
+         plainto_tsquery('english', %s) AS query
+    WHERE to_tsvector('english', project.name || ' ' || project.description) @@ query
+          AND member.contributor_id = %s
+    UNION ALL
+    SELECT 'comment', comment.id, issue.project_id, comment.issue_id,
+           ts_rank(to_tsvector('english', comment.description), query)
+    FROM {Comment._meta.db_table} AS comment
+    JOIN {Issue._meta.db_table} AS issue ON issue.id = comment.issue_id
+    JOIN {MEMBERSHIP_TABLE} AS member ON member.project_id = issue.project_id,
+         plainto_tsquery('english', %s) AS query
+    WHERE to_tsvector('english', comment.description) @@ query AND member.contributor_id = %s
+"""
+
+
+def search_terms(text: str) -> list[str]:
+    """Words of `text`, the operators and punctuation of either query syntax dropped"""
+    return re.findall(r"\w+", text)[:MAX_TERMS]
+
+
+class SearchResults:
+    """
+    Projects and comments of the projects of a contributor matching every term, best
+    first, as dicts. Counted and sliced by the paginator, each with one query.
+    """
+
+    def __init__(self, terms: list[str], contributor_id: int):
+        self.using: str = router.db_for_read(Comment)
+        vendor: str = connections[self.using].vendor
+        if vendor == "sqlite":
+            self.sql = SQLITE_HITS
+            query = " ".join(f'"{term}"' for term in terms)  # quoted: FTS5 strings, not operators
+        elif vendor == "postgresql":
+            self.sql = POSTGRES_HITS
+            query = " ".join(terms)
+        else:
+            raise NotSupportedError(f"Full-text search is not available on {vendor}.")
+        self.params: list = [query, contributor_id, query, contributor_id]
+
+    def count(self) -> int:
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM ({self.sql}) AS hits", self.params)
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, page: slice) -> list[dict]:
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f"{self.sql} ORDER BY rank DESC, type, id LIMIT %s OFFSET %s",
+                [*self.params, page.stop - page.start, page.start]
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def update_search_index(model: type[Model], *instances: Model, using: str = "default"):
+    """Indexes the searched fields of `instances`, replacing their previous entries"""
+    connection = connections[using]
+    if connection.vendor != "sqlite" or model not in SEARCH_FIELDS or not instances:
+        return
+    fields = SEARCH_FIELDS[model]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {model._meta.db_table}_fts (rowid, {', '.join(fields)}) "
+            f"VALUES ({', '.join(['%s'] * (len(fields) + 1))})",
+            [[instance.pk, *(getattr(instance, field) for field in fields)] for instance in instances]
+        )
+
+
+def remove_from_search_index(model: type[Model], pks: list[int] | QuerySet, using: str = "default"):
+    """Drops the entries of `pks`, a list or a values() query of the row ids"""
+    connection = connections[using]
+    if connection.vendor != "sqlite" or model not in SEARCH_FIELDS:
+        return
+    with connection.cursor() as cursor:
+        if isinstance(pks, QuerySet):
+            sql, params = pks.query.sql_with_params()
+            cursor.execute(f"DELETE FROM {model._meta.db_table}_fts WHERE rowid IN ({sql})", params)
+        elif pks:
+            cursor.executemany(f"DELETE FROM {model._meta.db_table}_fts WHERE rowid = %s", [[pk] for pk in pks])
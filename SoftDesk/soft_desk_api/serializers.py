@@ -1,11 +1,88 @@
 from django.contrib.auth.hashers import make_password
+from django.db.models import Prefetch, QuerySet
 from rest_framework.exceptions import PermissionDenied
-from rest_framework.serializers import ModelSerializer, SerializerMethodField, PrimaryKeyRelatedField, CharField, ValidationError
-from .fields import ContributorField
+from rest_framework.serializers import ModelSerializer, SerializerMethodField, CharField, ValidationError, \
+    Serializer, ChoiceField, IntegerField, FloatField
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from .authentication import CONTRIBUTOR_ID_CLAIM, get_active_contributor
+from .fields import ContributorField, CachedPrimaryKeyRelatedField
 from .models import Contributor, Project, Issue, Comment, User
+from .permissions import get_project_ids, is_contributor
+from .representation import CompiledRepresentationMixin
+
+
+def memoize(serializer, key: tuple, compute):
+    """Shares `compute()` across the items of a bulk request through its `lookup_cache`"""
+    lookup_cache: dict | None = serializer.context.get("lookup_cache")
+    if lookup_cache is None:
+        return compute()
+    if key not in lookup_cache:
+        lookup_cache[key] = compute()
+    return lookup_cache[key]
+
+
+def parse_fields(value: str) -> dict[str, set[str]]:
+    """`id,author.username,author.age` -> {"id": set(), "author": {"username", "age"}}"""
+    fields: dict[str, set[str]] = {}
+    for path in filter(None, (part.strip() for part in value.split(","))):
+        name, _, subfield = path.partition(".")
+        fields.setdefault(name, set())
+        if subfield:
+            fields[name].add(subfield)
+    return fields
+
+
+class FieldSelection:
+    """
+    Fields to render (None: all of them) and nested relations to embed (None: all of them,
+    the others render as ids). Selecting nested fields with a dotted path embeds the relation.
+    """
+
+    def __init__(self, fields: dict[str, set[str]] | None = None, expand: set[str] | None = None):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_request(cls, request) -> "FieldSelection":
+        """Reads `?fields=` and `?expand=` on GET requests, writes answer every field"""
+        if request is None or request.method != "GET":
+            return cls()
+        fields: str | None = request.query_params.get("fields")
+        expand: str | None = request.query_params.get("expand")
+        return cls(
+            parse_fields(fields) if fields is not None else None,
+            set(parse_fields(expand)) if expand is not None else None,
+        )
+
+    def __contains__(self, name: str) -> bool:
+        return self.fields is None or name in self.fields
+
+    def expands(self, name: str) -> bool:
+        return name in self and (
+            self.expand is None or name in self.expand or bool(self.fields and self.fields[name])
+        )
+
+    def nested(self, name: str) -> "FieldSelection":
+        """Selection inside the embedded relation `name`"""
+        subfields: set[str] = (self.fields or {}).get(name)
+        return FieldSelection({subfield: set() for subfield in subfields} if subfields else None)
+
 
+class SparseFieldsMixin:
+    """
+    Renders the fields of `selection` only. Without one, top-level serializers take it
+    from the request (see FieldSelection.from_request).
+    """
 
-class NestedContributorSerializer(ModelSerializer):
+    def __init__(self, *args, selection: FieldSelection | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selection = selection or FieldSelection.from_request(self.context.get("request"))
+        if self.selection.fields is not None:
+            for name in [name for name in self.fields if name not in self.selection]:
+                self.fields.pop(name)
+
+
+class NestedContributorSerializer(CompiledRepresentationMixin, SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Contributor
         fields = [
@@ -21,6 +98,26 @@ class NestedContributorSerializer(ModelSerializer):
             "authored_comments"
         ]
 
+    @staticmethod
+    def get_related(lookup: str, selection: FieldSelection) -> list[str]:
+        """select_related() lookups of the contributors reached by `lookup`"""
+        return [f"{lookup}__user" if "username" in selection else lookup]
+
+    @staticmethod
+    def get_prefetches(lookup: str, selection: FieldSelection = FieldSelection()) -> list[Prefetch]:
+        """Prefetches feeding the selected reverse id lists of the contributors reached by `lookup`"""
+        querysets: dict[str, QuerySet] = {
+            "authored_projects": Project.objects.only("id", "author_id"),
+            "projects_contribution": Project.objects.only("id"),
+            "assigned_issues": Issue.objects.only("id", "assigned_contributor_id"),
+            "authored_issues": Issue.objects.only("id", "author_id"),
+            "authored_comments": Comment.objects.only("id", "author_id"),
+        }
+        return [
+            Prefetch(f"{lookup}__{name}", queryset=queryset)
+            for name, queryset in querysets.items() if name in selection
+        ]
+
 
 class NestedProjectSerializer(ModelSerializer):
     class Meta:
@@ -37,7 +134,7 @@ class NestedProjectSerializer(ModelSerializer):
         ]
 
 
-class NestedIssueSerializer(ModelSerializer):
+class NestedIssueSerializer(CompiledRepresentationMixin, SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Issue
         fields = [
@@ -52,8 +149,18 @@ class NestedIssueSerializer(ModelSerializer):
             "comments"
         ]
 
+    @staticmethod
+    def get_prefetches(lookup: str, selection: FieldSelection = FieldSelection()) -> list[Prefetch]:
+        """Prefetches feeding the issues reached by `lookup` and their comment id lists"""
+        prefetches: list[Prefetch] = [Prefetch(lookup)]
+        if "comments" in selection:
+            prefetches.append(
+                Prefetch(f"{lookup}__comments", queryset=Comment.objects.only("id", "issue_id"))
+            )
+        return prefetches
+
 
-class NestedCommentSerializer(ModelSerializer):
+class NestedCommentSerializer(CompiledRepresentationMixin, SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Comment
         fields = [
@@ -65,7 +172,7 @@ class NestedCommentSerializer(ModelSerializer):
         ]
 
 
-class ContributorSerializer(ModelSerializer):
+class ContributorSerializer(CompiledRepresentationMixin, SparseFieldsMixin, ModelSerializer):
     username = CharField()
     password = CharField(write_only=True)
 
@@ -83,6 +190,15 @@ class ContributorSerializer(ModelSerializer):
             "comments",
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet, selection: FieldSelection = FieldSelection()) -> QuerySet:
+        """Load the user and the selected statistics in a single query"""
+        if "username" in selection:
+            queryset = queryset.select_related("user")
+        statistics = [name for name in ("project_contributions", "issue_contributions", "comments")
+                      if name in selection]
+        return queryset.with_statistics(*statistics) if statistics else queryset
+
     def validate_username(self, value):
         if User.objects.filter(username=value).exists() and \
                 self.context["request"].user != User.objects.filter(username=value).first():
@@ -116,7 +232,7 @@ class ContributorSerializer(ModelSerializer):
         return instance
 
 
-class ProjectSerializer(ModelSerializer):
+class ProjectSerializer(CompiledRepresentationMixin, SparseFieldsMixin, ModelSerializer):
     author = SerializerMethodField()
     contributors = SerializerMethodField()
     issues = SerializerMethodField()
@@ -131,20 +247,60 @@ class ProjectSerializer(ModelSerializer):
             "contributors",
             "type",
             "created_time",
-            "issues"
+            "issues",
+            "todo_issue_count",
+            "in_progress_issue_count",
+            "finished_issue_count",
+            "comment_count",
+            "last_activity_time"
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet, selection: FieldSelection = FieldSelection()) -> QuerySet:
+        """Load the selected part of the nested graph with a constant number of queries"""
+        prefetches: list[Prefetch] = []
+        if selection.expands("author"):
+            author: FieldSelection = selection.nested("author")
+            queryset = queryset.select_related(*NestedContributorSerializer.get_related("author", author))
+            prefetches += NestedContributorSerializer.get_prefetches("author", author)
+        if selection.expands("contributors"):
+            contributors: QuerySet = Contributor.objects.all()
+            if "username" in selection.nested("contributors"):
+                contributors = contributors.select_related("user")
+            prefetches.append(Prefetch("contributors", queryset=contributors))
+            prefetches += NestedContributorSerializer.get_prefetches(
+                "contributors", selection.nested("contributors")
+            )
+        elif "contributors" in selection:
+            prefetches.append(Prefetch("contributors", queryset=Contributor.objects.only("id")))
+        if selection.expands("issues"):
+            prefetches += NestedIssueSerializer.get_prefetches("issues", selection.nested("issues"))
+        elif "issues" in selection:
+            prefetches.append(Prefetch("issues", queryset=Issue.objects.only("id", "project_id")))
+        return queryset.prefetch_related(*prefetches)
+
     def get_author(self, obj):
-        return NestedContributorSerializer(obj.author).data
+        if not self.selection.expands("author"):
+            return obj.author_id
+        return NestedContributorSerializer(obj.author, selection=self.selection.nested("author")).data
 
     def get_contributors(self, obj):
-        return NestedContributorSerializer(obj.contributors.all(), many=True).data
+        if not self.selection.expands("contributors"):
+            return [contributor.id for contributor in obj.contributors.all()]
+        return NestedContributorSerializer(
+            obj.contributors.all(), many=True, selection=self.selection.nested("contributors")
+        ).data
 
     def get_issues(self, obj):
-        return NestedIssueSerializer(obj.issues.all(), many=True).data
+        if not self.selection.expands("issues"):
+            return [issue.id for issue in obj.issues.all()]
+        return NestedIssueSerializer(
+            obj.issues.all(), many=True, selection=self.selection.nested("issues")
+        ).data
 
 
-class IssueSerializer(ModelSerializer):
+class IssueSerializer(CompiledRepresentationMixin, SparseFieldsMixin, ModelSerializer):
+    project = CachedPrimaryKeyRelatedField(queryset=Project.objects.all())
     assigned_contributor = ContributorField(required=False, allow_null=True)
     author = SerializerMethodField()
     comments = SerializerMethodField()
@@ -161,20 +317,41 @@ class IssueSerializer(ModelSerializer):
             "label",
             "created_time",
             "comments",
+            "comment_count",
+            "last_activity_time",
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet, selection: FieldSelection = FieldSelection()) -> QuerySet:
+        """Load the selected part of the nested graph with a constant number of queries"""
+        prefetches: list[Prefetch] = []
+        if "assigned_contributor" in selection:
+            queryset = queryset.select_related("assigned_contributor__user")
+        if selection.expands("author"):
+            author: FieldSelection = selection.nested("author")
+            queryset = queryset.select_related(*NestedContributorSerializer.get_related("author", author))
+            prefetches += NestedContributorSerializer.get_prefetches("author", author)
+        if selection.expands("comments"):
+            prefetches.append(Prefetch("comments"))
+        elif "comments" in selection:
+            prefetches.append(Prefetch("comments", queryset=Comment.objects.only("id", "issue_id")))
+        return queryset.prefetch_related(*prefetches)
+
     def validate(self, attrs):
-        attrs["author"] = self.context["request"].user.contributor
+        request = self.context["request"]
+        attrs["author"] = request.user.contributor
         if not attrs.get("assigned_contributor"):
-            attrs["assigned_contributor"] = self.context["request"].user.contributor
+            attrs["assigned_contributor"] = request.user.contributor
         if not attrs.get("project"):
             attrs["project"] = self.instance.project
 
-        if attrs["author"] not in attrs["project"].contributors.all() \
-                and attrs["author"] != attrs["project"].author:
+        project: Project = attrs["project"]
+        if project.id not in get_project_ids(request) and attrs["author"].id != project.author_id:
             raise PermissionDenied("You are not contributor or author of this project.")
-        if attrs["assigned_contributor"] not in attrs["project"].contributors.all() \
-                and attrs["assigned_contributor"] != attrs["project"].author:
+        assigned_id: int = attrs["assigned_contributor"].id
+        if assigned_id not in (attrs["author"].id, project.author_id) \
+                and not memoize(self, ("contributor", assigned_id, project.id),
+                                lambda: is_contributor(assigned_id, project.id)):
             raise PermissionDenied(
                 "Assigned contributor is not a contributor or author of this project."
             )
@@ -184,14 +361,20 @@ class IssueSerializer(ModelSerializer):
         return NestedContributorSerializer(obj.assigned_contributor).data
 
     def get_author(self, obj):
-        return NestedContributorSerializer(obj.author).data
+        if not self.selection.expands("author"):
+            return obj.author_id
+        return NestedContributorSerializer(obj.author, selection=self.selection.nested("author")).data
 
     def get_comments(self, obj):
-        return NestedCommentSerializer(obj.comments.all(), many=True).data
+        if not self.selection.expands("comments"):
+            return [comment.id for comment in obj.comments.all()]
+        return NestedCommentSerializer(
+            obj.comments.all(), many=True, selection=self.selection.nested("comments")
+        ).data
 
 
-class CommentSerializer(ModelSerializer):
-    issue = PrimaryKeyRelatedField(queryset=Issue.objects.all())
+class CommentSerializer(CompiledRepresentationMixin, SparseFieldsMixin, ModelSerializer):
+    issue = CachedPrimaryKeyRelatedField(queryset=Issue.objects.all())
     author = SerializerMethodField()
 
     class Meta:
@@ -204,17 +387,53 @@ class CommentSerializer(ModelSerializer):
             "created_time"
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet, selection: FieldSelection = FieldSelection()) -> QuerySet:
+        """Load the selected part of the nested graph with a constant number of queries"""
+        queryset = queryset.select_related("issue")
+        if not selection.expands("author"):
+            return queryset
+        author: FieldSelection = selection.nested("author")
+        return queryset.select_related(*NestedContributorSerializer.get_related("author", author)) \
+            .prefetch_related(*NestedContributorSerializer.get_prefetches("author", author))
+
     def get_issue(self, obj):
         return NestedIssueSerializer(obj.issue).data
 
     def get_author(self, obj):
-        return NestedContributorSerializer(obj.author).data
+        if not self.selection.expands("author"):
+            return obj.author_id
+        return NestedContributorSerializer(obj.author, selection=self.selection.nested("author")).data
 
     def validate(self, attrs):
-        attrs["author"] = self.context["request"].user.contributor
+        request = self.context["request"]
+        attrs["author"] = request.user.contributor
         if not attrs.get("issue"):
-            attrs["issue"] = Comment.objects.get(pk=self.context["view"].kwargs["pk"]).issue
-        if attrs["author"] not in attrs["issue"].project.contributors.all() \
-                and attrs["author"] != attrs["issue"].project.author:
+            attrs["issue"] = self.instance.issue
+        project_id: int = attrs["issue"].project_id
+        if project_id not in get_project_ids(request) \
+                and not memoize(self, ("author", attrs["author"].id, project_id),
+                                lambda: Project.objects.filter(pk=project_id, author=attrs["author"]).exists()):
             raise PermissionDenied("You are not contributor or author of this project.")
         return attrs
+
+
+class SearchHitSerializer(Serializer):
+    """A project or a comment matching a search, with the project (and issue) it belongs to"""
+    type = ChoiceField(choices=["project", "comment"])
+    id = IntegerField()
+    project = IntegerField()
+    issue = IntegerField(allow_null=True)
+    rank = FloatField()
+
+
+class ContributorTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Adds the contributor claim of ContributorJWTAuthentication, warming its account cache"""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        contributor = get_active_contributor(user.id)
+        if contributor is not None:
+            token[CONTRIBUTOR_ID_CLAIM] = contributor.id
+        return token
@@ -0,0 +1,219 @@
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed
+from django.db.models import Q
+from django.dispatch import receiver
+from .authentication import invalidate_active_contributors
+from .caching import now_and_on_commit
+from .counters import count_changed_issue, count_comments, count_created_issues, count_moved_comment, \
+    uncount_deleted_issue
+from .models import Contributor, Project, Issue, Comment, touch_projects
+from .pagination import invalidate_counts
+from .permissions import invalidate_project_ids
+from .search import SEARCH_FIELDS, remove_from_search_index, update_search_index
+
+PASSWORD_ONLY = frozenset({"password"})  # rehash on login, nothing rendered changes
+
+
+@receiver(post_save, sender=Contributor)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Comment)
+def invalidate_counts_on_create(sender, instance, created, **kwargs):
+    if created:
+        invalidate_counts(sender)
+
+
+@receiver(post_save, sender=Issue)
+def invalidate_issue_counts(sender, instance, **kwargs):
+    """Issue lists are filtered on the assignee, which any update may change"""
+    invalidate_counts(Issue)
+
+
+@receiver(post_delete, sender=Contributor)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Issue)
+@receiver(post_delete, sender=Comment)
+def invalidate_counts_on_delete(sender, instance, using, **kwargs):
+    invalidate_counts(sender)
+    if sender is Contributor:
+        now_and_on_commit(invalidate_project_ids, instance.id, using=using)
+
+
+@receiver(m2m_changed, sender=Project.contributors.through)
+def invalidate_counts_on_membership_change(sender, action, **kwargs):
+    """Project and Comment lists are filtered on the project contributors"""
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_counts(Project, Comment)
+
+
+@receiver(m2m_changed, sender=Project.contributors.through)
+def invalidate_project_ids_on_membership_change(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """Again once committed: a removed contributor must not keep reading from a re-cached set"""
+    if reverse:  # instance is the Contributor
+        if action in ("post_add", "post_remove", "post_clear"):
+            now_and_on_commit(invalidate_project_ids, instance.id, using=using)
+    elif action == "pre_clear":
+        now_and_on_commit(invalidate_project_ids, *instance.contributors.values_list("id", flat=True), using=using)
+    elif action in ("post_add", "post_remove"):
+        now_and_on_commit(invalidate_project_ids, *pk_set, using=using)
+
+
+@receiver(post_save, sender=Contributor)
+@receiver(post_save, sender=Issue)
+@receiver(post_save, sender=Comment)
+def touch_projects_on_change(sender, instance, **kwargs):
+    touch_projects(instance)
+
+
+@receiver(post_save, sender=Project)
+def touch_project_on_update(sender, instance, created, **kwargs):
+    """A new project starts at version 1, its contributors are touched by m2m_changed"""
+    if not created:
+        touch_projects(instance)
+
+
+def cascaded_contributors(instance) -> Q:
+    """Contributors whose id lists lose the rows cascaded from `instance`"""
+    if isinstance(instance, Project):
+        return Q(pk=instance.author_id) | Q(projects_contribution=instance) \
+            | Q(pk__in=Issue.objects.filter(project=instance).values("author")) \
+            | Q(pk__in=Issue.objects.filter(project=instance).values("assigned_contributor")) \
+            | Q(pk__in=Comment.objects.filter(issue__project=instance).values("author"))
+    if isinstance(instance, Issue):
+        return Q(pk__in=Comment.objects.filter(issue=instance).values("author"))
+    return Q(pk__in=[])
+
+
+@receiver(pre_delete, sender=Contributor)
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Issue)
+@receiver(pre_delete, sender=Comment)
+def touch_projects_on_delete(sender, instance, origin, **kwargs):
+    """
+    Sent before any row is removed, while memberships still exist. Rows cascaded from
+    a deleted project or issue are covered by the touch of that origin.
+    """
+    if isinstance(origin, (Project, Issue)) and origin is not instance:
+        return
+    if isinstance(instance, (Project, Issue)):
+        touch_projects(instance, *Contributor.objects.filter(cascaded_contributors(instance)).only("id"))
+    else:
+        touch_projects(instance)
+
+
+@receiver(post_save, sender=User)
+def touch_projects_on_username_change(sender, instance, created, update_fields, **kwargs):
+    if not created and update_fields != PASSWORD_ONLY and hasattr(instance, "contributor"):
+        touch_projects(instance.contributor)
+
+
+@receiver(m2m_changed, sender=Project.contributors.through)
+def touch_projects_on_membership_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action == "pre_clear":
+        related = instance.projects_contribution.all() if reverse else instance.contributors.all()
+        touch_projects(instance, *related)
+    elif action in ("post_add", "post_remove"):
+        touch_projects(instance, *model.objects.filter(pk__in=pk_set).only("id"))
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Comment)
+def update_search_index_on_save(sender, instance, update_fields, using, **kwargs):
+    if update_fields is None or not update_fields.isdisjoint(SEARCH_FIELDS[sender]):
+        update_search_index(sender, instance, using=using)
+
+
+@receiver(pre_delete, sender=Project)
+@receiver(pre_delete, sender=Issue)
+def remove_cascaded_comments_from_search_index(sender, instance, origin, using, **kwargs):
+    """One statement for the comments of a deleted project or issue, before they are removed"""
+    if origin is instance:
+        comments = Comment.objects.using(using).filter(**{"issue__project" if sender is Project else "issue": instance})
+        remove_from_search_index(Comment, comments.values("id"), using=using)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Comment)
+def remove_from_search_index_on_delete(sender, instance, origin, using, **kwargs):
+    if not isinstance(origin, (Project, Issue)) or origin is instance:
+        remove_from_search_index(sender, [instance.pk], using=using)
+
+
+@receiver(pre_save, sender=Issue)
+@receiver(pre_save, sender=Comment)
+@receiver(pre_delete, sender=Issue)
+def load_counted_values(sender, instance, using, origin=None, **kwargs):
+    """
+    Where the counters include the row, re-read and locked in the transaction of the
+    save or delete: the values loaded with the instance may predate a concurrent write.
+    Rows deleted along another keep the values the deletion loaded them with.
+    """
+    if instance._state.adding:
+        return
+    rows = sender.objects.using(using).filter(pk=instance.pk)
+    if origin is None or origin is instance:
+        rows = rows.select_for_update()
+    elif hasattr(instance, "counted_as"):
+        return
+    if sender is Issue:
+        instance.counted_as = rows.values_list("project_id", "state").first()
+    else:
+        instance.counted_issue_id = rows.values_list("issue_id", flat=True).first()
+
+
+@receiver(post_save, sender=Issue)
+def update_issue_counters(sender, instance, created, using, **kwargs):
+    if created:
+        count_created_issues(instance, using=using)
+    elif instance.counted_as is not None:
+        count_changed_issue(instance, using=using)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_counters(sender, instance, created, using, **kwargs):
+    if created:
+        count_comments(instance, using=using)
+    elif instance.counted_issue_id is not None:
+        count_moved_comment(instance, using=using)
+
+
+@receiver(pre_delete, sender=Issue)
+def uncount_deleted_issue_and_comments(sender, instance, origin, using, **kwargs):
+    """The comments cascaded from a deleted issue are uncounted here, in one statement"""
+    if origin is instance and instance.counted_as is not None:
+        uncount_deleted_issue(instance, with_comments=True, using=using)
+
+
+@receiver(post_delete, sender=Issue)
+def uncount_deleted_issues(sender, instance, origin, using, **kwargs):
+    """Issues of a deleted queryset, their comments are uncounted one by one"""
+    if not isinstance(origin, (Project, Issue)) and instance.counted_as is not None:
+        uncount_deleted_issue(instance, with_comments=False, using=using)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_deleted_comments(sender, instance, origin, using, **kwargs):
+    if not isinstance(origin, (Project, Issue)):
+        count_comments(instance, delta=-1, using=using)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Contributor)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Contributor)
+def invalidate_active_contributor(sender, instance, using, **kwargs):
+    """
+    Tokens of a deleted or deactivated user are refused from the next request, and from
+    the commit on whatever requests authenticated meanwhile cached
+    """
+    now_and_on_commit(invalidate_active_contributors, instance.id if sender is User else instance.user_id,
+                      using=using)
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """PRAGMAS of the DATABASES entry, set on every new SQLite connection"""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for name, value in connection.settings_dict.get("PRAGMAS", {}).items():
+                cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,54 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.response import Response
+from ..models import Contributor, Issue, Project, Comment
+from ..serializers import ContributorTokenObtainPairSerializer
+from django.contrib.auth.models import User
+
+
+class QueryBudgetMixin:
+    """
+    Seeds a growing dataset around one contributor and checks that an endpoint runs
+    the same number of queries at every size, within the `query_budgets` of its viewset.
+    """
+    seed_sizes = (1, 5)
+
+    def setUp(self):
+        self.contributor = Contributor.objects.create(user=User.objects.create(username="budget"))
+        self.authenticate(self.contributor)
+
+    def authenticate(self, contributor):
+        token = ContributorTokenObtainPairSerializer.get_token(contributor.user)  # as issued by /api/token/
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+
+    def seed(self, count) -> dict:
+        """Adds `count` projects of the contributor, each with a teammate, an issue and comments"""
+        for _ in range(count):
+            teammate = Contributor.objects.create(
+                user=User.objects.create(username=f"seed{User.objects.count()}")
+            )
+            project = Project.objects.create(name="seed", author=self.contributor)
+            project.contributors.add(self.contributor, teammate)
+            issue = Issue.objects.create(
+                project=project, author=self.contributor, assigned_contributor=teammate
+            )
+            Comment.objects.create(issue=issue, author=teammate, description="seed")
+            comment = Comment.objects.create(issue=issue, author=self.contributor, description="seed")
+        return {"teammate": teammate, "project": project, "issue": issue, "comment": comment}
+
+    def assertQueryBudget(self, viewset, action, send):
+        """`send(seeded)` performs the request against the objects of the latest seed"""
+        counts: list[int] = []
+        for size in self.seed_sizes:
+            seeded: dict = self.seed(size)
+            with CaptureQueriesContext(connection) as context:
+                response: Response = send(seeded)
+            self.assertLess(response.status_code, 300, f"{viewset.__name__}.{action} failed")
+            counts.append(len(context.captured_queries))
+        budget: int = viewset.query_budgets[action]
+        self.assertEqual(
+            len(set(counts)), 1, f"{viewset.__name__}.{action} queries grow with the dataset: {counts}"
+        )
+        self.assertLessEqual(
+            counts[-1], budget, f"{viewset.__name__}.{action} exceeds its budget of {budget} queries"
+        )
@@ -0,0 +1,65 @@
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Contributor, Issue, Project, Comment
+from django.contrib.auth.models import User
+
+
+class AsyncReadAPI(APITestCase):
+    def setUp(self):
+        self.user_1 = User.objects.create_user(username='user1', password='pass1')
+        self.user_2 = User.objects.create_user(username='user2', password='pass2')
+        self.contributor_1 = Contributor.objects.create(user=self.user_1)
+        self.contributor_2 = Contributor.objects.create(user=self.user_2)
+        self.headers = {"Authorization": f'Bearer {RefreshToken.for_user(self.contributor_1).access_token}'}
+        self.client.credentials(HTTP_AUTHORIZATION=self.headers["Authorization"])
+
+        project_1 = Project.objects.create(id=99999, name="a", description="aaa", author=self.contributor_1)
+        project_1.contributors.add(self.contributor_1, self.contributor_2)
+        project_2 = Project.objects.create(id=88888, name="b", description="bbb", author=self.contributor_2)
+        project_2.contributors.add(self.contributor_2)
+
+        issue_1 = Issue.objects.create(
+            id=77777, project=project_1, author=self.contributor_2, assigned_contributor=self.contributor_1
+        )
+        issue_2 = Issue.objects.create(
+            id=66666, project=project_2, author=self.contributor_2, assigned_contributor=self.contributor_2
+        )
+        Comment.objects.create(id=11111, issue=issue_1, author=self.contributor_1, description="Some words")
+        Comment.objects.create(id=22222, issue=issue_1, author=self.contributor_2, description="Other words")
+        Comment.objects.create(id=33333, issue=issue_2, author=self.contributor_2, description="Some words")
+
+    async def assertSameAsSync(self, path: str, status: int = 200):
+        sync_response = await self.async_client.get(f'/api/{path}', headers=self.headers)
+        async_response = await self.async_client.get(f'/api/async/{path}', headers=self.headers)
+        self.assertEqual(async_response.status_code, status)
+        self.assertEqual(sync_response.status_code, status)
+        self.assertEqual(async_response.content.replace(b'/api/async/', b'/api/'), sync_response.content)
+
+    async def test_list_and_retrieve_match_sync_endpoints(self):
+        for path in ('Project/', 'Project/99999/', 'Issue/', 'Issue/77777/', 'Comment/', 'Comment/11111/'):
+            with self.subTest(path=path):
+                await self.assertSameAsSync(path)
+
+    async def test_query_parameters(self):
+        for path in ('Project/?fields=id,name', 'Issue/?expand=comments', 'Comment/?limit=1&offset=1',
+                     'Comment/?cursor=&limit=1&count=1'):
+            with self.subTest(path=path):
+                await self.assertSameAsSync(path)
+
+    async def test_retrieve_outside_projects(self):
+        await self.assertSameAsSync('Project/88888/', 403)
+        await self.assertSameAsSync('Comment/33333/', 403)
+        await self.assertSameAsSync('Issue/12345/', 404)
+
+    async def test_unauthenticated(self):
+        response = await self.async_client.get('/api/async/Project/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_read_only(self):
+        response = await self.async_client.post('/api/async/Project/', {"name": "c"}, headers=self.headers)
+        self.assertEqual(response.status_code, 405)
+
+    def test_sync_client(self):
+        response = self.client.get('/api/async/Issue/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.get("count"), 1)
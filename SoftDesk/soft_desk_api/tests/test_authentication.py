@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from ..authentication import CONTRIBUTOR_ID_CLAIM, active_contributor_key
+from ..models import Contributor, Project
+from ..serializers import ContributorTokenObtainPairSerializer
+from django.contrib.auth.models import User
+
+
+class ContributorJWTAuthenticationAPI(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='pass1')
+        User.objects.create(username='padding')  # user and contributor ids differ
+        self.contributor = Contributor.objects.create(user=self.user)
+        project = Project.objects.create(id=99999, name="a", author=self.contributor)
+        project.contributors.add(self.contributor)
+        self.token = ContributorTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_token_view_adds_contributor_claim(self):
+        self.client.credentials()
+        response: Response = self.client.post('/api/token/', data={"username": "user1", "password": "pass1"})
+        self.assertEqual(response.status_code, 200)
+        token = AccessToken(response.data["access"])
+        self.assertEqual(token[CONTRIBUTOR_ID_CLAIM], self.contributor.id)
+        self.assertEqual(token["user_id"], str(self.user.id))
+
+    def test_no_user_or_contributor_lookup(self):
+        with CaptureQueriesContext(connection) as context:
+            response: Response = self.client.get('/api/Project/99999/')
+        self.assertEqual(response.status_code, 200)
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        self.assertNotIn('WHERE "auth_user"."id" =', sql)
+        self.assertNotIn('WHERE "soft_desk_api_contributor"."user_id" =', sql)
+
+    def test_writes_with_claims(self):
+        response: Response = self.client.post('/api/Project/', data={"name": "b"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Project.objects.get(name="b").author, self.contributor)
+
+    def test_deleted_user_refused(self):
+        response: Response = self.client.delete(f'/api/Contributor/{self.contributor.id}/')
+        self.assertEqual(response.status_code, 204)
+        response: Response = self.client.get('/api/Project/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_deleted_user_recached_during_deletion_refused(self):
+        self.client.get('/api/Project/')  # caches the account
+        user_id: int = self.user.id
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.user.delete()
+                # a request authenticating meanwhile still sees the committed account
+                cache.set(active_contributor_key(user_id), self.contributor)
+        response: Response = self.client.get('/api/Project/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_deactivated_user_refused(self):
+        self.client.get('/api/Project/')  # caches the account
+        self.user.is_active = False
+        self.user.save()
+        response: Response = self.client.get('/api/Project/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_claim_of_another_contributor_refused(self):
+        other = Contributor.objects.create(user=User.objects.create(username='user2'))
+        token = RefreshToken.for_user(self.user)
+        token[CONTRIBUTOR_ID_CLAIM] = other.id
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        response: Response = self.client.get('/api/Project/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_without_claim(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        response: Response = self.client.get('/api/Project/99999/')
+        self.assertEqual(response.status_code, 200)
@@ -1,7 +1,13 @@
+from unittest.mock import patch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 from ..models import Contributor, Issue, Project, Comment
+from ..representation import CompiledRepresentationMixin
+from ..serializers import CommentSerializer
 from django.contrib.auth.models import User
 
 
@@ -60,6 +66,38 @@ class CommentAPI(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data.get("count"), 2)
 
+    def test_comment_get_list_without_distinct(self):
+        with CaptureQueriesContext(connection) as context:
+            response: Response = self.client.get('/api/Comment/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any("DISTINCT" in query["sql"] for query in context.captured_queries))
+        ids = [comment["id"] for comment in response.data.get("results")]
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_comment_get_list_cursor(self):
+        response: Response = self.client.get('/api/Comment/?cursor=&limit=1&count=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.get("count"), 2)
+        self.assertEqual([comment["id"] for comment in response.data.get("results")], [11111])
+        response: Response = self.client.get(response.data.get("next"))
+        self.assertEqual([comment["id"] for comment in response.data.get("results")], [22222])
+        self.assertIsNone(response.data.get("next"))
+
+    def test_comment_get_list_cursor_without_aggregate(self):
+        with CaptureQueriesContext(connection) as context:
+            response: Response = self.client.get('/api/Comment/?cursor=&limit=1')
+        self.assertEqual(response.status_code, 200)
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("SUM(", sql)
+
+        etag = response.headers["ETag"]
+        response = self.client.get('/api/Comment/?cursor=&limit=1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.get(id=11111).save()  # bumps the version of its project
+        response = self.client.get('/api/Comment/?cursor=&limit=1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
     def test_comment_get_obj_from_author(self):
         response: Response = self.client.get('/api/Comment/11111/')
         self.assertEqual(response.status_code, 200)
@@ -70,6 +108,27 @@ class CommentAPI(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data.get("id"), 22222)
 
+    def test_comment_get_obj_not_modified(self):
+        etag = self.client.get('/api/Comment/11111/').headers["ETag"]
+        response: Response = self.client.get('/api/Comment/11111/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.create(issue_id=77777, author=self.contributor_1, description="New words")
+        response: Response = self.client.get('/api/Comment/11111/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_comment_get_list_expand(self):
+        response: Response = self.client.get('/api/Comment/?expand=')
+        self.assertEqual(response.data["results"][0]["author"], self.contributor_1.id)
+        response: Response = self.client.get('/api/Comment/?fields=author.username')
+        self.assertEqual(response.data["results"][0], {"author": {"username": "user1"}})
+
+    def test_comments_compiled_representation_matches_drf(self):
+        instances = list(CommentSerializer.setup_eager_loading(Comment.objects.all()))
+        compiled = JSONRenderer().render(CommentSerializer(instances, many=True).data)
+        with patch.object(CompiledRepresentationMixin, "compiled_representation", False):
+            drf = JSONRenderer().render(CommentSerializer(instances, many=True).data)
+        self.assertEqual(compiled, drf)
+
     def test_comment_post(self):
         data = {"issue": 77777, "description": "Some words"}
         response: Response = self.client.post('/api/Comment/', data=data)
@@ -83,6 +142,15 @@ class CommentAPI(APITestCase):
         response: Response = self.client.post('/api/Comment/', data=data)
         self.assertEqual(response.status_code, 403)
 
+    def test_comment_bulk_post(self):
+        data = [{"issue": 77777, "description": "Some words"}, {"issue": 66666, "description": "Some words"}]
+        response: Response = self.client.post('/api/Comment/bulk/', data=data, format="json")
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result["status"] for result in response.data], [201, 403])
+        new_comment = Comment.objects.get(pk=response.data[0]["id"])
+        self.assertEqual(new_comment.author, self.contributor_1)
+        self.assertEqual(new_comment.issue_id, 77777)
+
     def test_comment_put_obj(self):
         data = {"issue": 77777, "description": "Some new words"}
         response: Response = self.client.put('/api/Comment/11111/', data=data)
@@ -1,3 +1,4 @@
+from django.db import connection
 from rest_framework.response import Response
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -31,6 +32,31 @@ class ContributorAPI(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data.get("count"), 2)
 
+    def test_contributor_statistics_annotated(self):
+        project = Project.objects.create(name="a", author=self.contributor_1)
+        project.contributors.add(self.contributor_1, self.contributor_2)
+        issue = Issue.objects.create(project=project, author=self.contributor_1,
+                                     assigned_contributor=self.contributor_2)
+        Comment.objects.create(issue=issue, author=self.contributor_2, description="Some words")
+        Comment.objects.create(issue=issue, author=self.contributor_2, description="Other words")
+        for contributor in Contributor.objects.with_statistics():
+            fallback = Contributor.objects.get(pk=contributor.pk)
+            with self.assertNumQueries(0):
+                statistics = (contributor.project_contributions,
+                              contributor.issue_contributions, contributor.comments)
+            self.assertEqual(statistics, (fallback.project_contributions,
+                                          fallback.issue_contributions, fallback.comments))
+        response: Response = self.client.get(f'/api/Contributor/{self.contributor_2.id}/')
+        self.assertEqual(response.data.get("project_contributions"), 1)
+        self.assertEqual(response.data.get("issue_contributions"), 1)
+        self.assertEqual(response.data.get("comments"), 2)
+
+    def test_contributor_get_list_sparse_fields(self):
+        with self.assertNumQueries(3):  # user, count and page, without the statistics subqueries
+            response: Response = self.client.get('/api/Contributor/?fields=id,comments')
+        self.assertNotIn("project_contributions_count", connection.queries[-1]["sql"])
+        self.assertEqual(set(response.data["results"][0]), {"id", "comments"})
+
     def test_contributor_get_obj(self):
         response: Response = self.client.get(f'/api/Contributor/{self.contributor_2.id}/')
         self.assertEqual(response.status_code, 200)
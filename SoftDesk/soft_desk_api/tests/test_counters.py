@@ -0,0 +1,143 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Contributor, Issue, Project, Comment
+from django.contrib.auth.models import User
+
+
+class CountersAPI(APITestCase):
+    def setUp(self):
+        self.user_1 = User.objects.create_user(username='user1', password='pass1')
+        self.contributor_1 = Contributor.objects.create(user=self.user_1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.contributor_1).access_token}')
+
+        self.project_1 = Project.objects.create(id=99999, name="Project 1", author=self.contributor_1)
+        self.project_1.contributors.add(self.contributor_1)
+        self.project_2 = Project.objects.create(id=88888, name="Project 2", author=self.contributor_1)
+        self.project_2.contributors.add(self.contributor_1)
+        self.issue_1 = Issue.objects.create(id=77777, project=self.project_1, author=self.contributor_1)
+        Comment.objects.create(id=11111, issue=self.issue_1, author=self.contributor_1)
+
+    def counters(self, project: Project) -> tuple[int, int, int, int]:
+        project.refresh_from_db()
+        return (project.todo_issue_count, project.in_progress_issue_count, project.finished_issue_count,
+                project.comment_count)
+
+    def test_create_and_delete(self):
+        self.assertEqual(self.counters(self.project_1), (1, 0, 0, 1))
+        response: Response = self.client.post(
+            '/api/Issue/', {"project": 99999, "state": "In Progress"}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        issue: Issue = Issue.objects.get(id=response.data["id"])
+        response = self.client.post('/api/Comment/', {"issue": issue.id, "description": "Comment"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.counters(self.project_1), (1, 1, 0, 2))
+        issue.refresh_from_db()
+        self.assertEqual(issue.comment_count, 1)
+        self.assertGreaterEqual(issue.last_activity_time, issue.created_time)
+
+        self.assertEqual(self.client.delete(f'/api/Comment/{response.data["id"]}/').status_code, 204)
+        issue.refresh_from_db()
+        self.assertEqual(issue.comment_count, 0)
+        self.assertEqual(self.client.delete('/api/Issue/77777/').status_code, 204)
+        self.assertEqual(self.counters(self.project_1), (0, 1, 0, 0))
+
+    def test_state_change(self):
+        before = self.project_1.last_activity_time
+        response: Response = self.client.patch('/api/Issue/77777/', {"state": "Finished"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counters(self.project_1), (0, 0, 1, 1))
+        self.assertGreater(self.project_1.last_activity_time, before)
+        response = self.client.patch('/api/Issue/77777/', {"state": "Finished"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counters(self.project_1), (0, 0, 1, 1))
+
+    def test_state_change_from_stale_instances(self):
+        first, second = Issue.objects.get(id=77777), Issue.objects.get(id=77777)
+        first.state = second.state = "Finished"
+        first.save()
+        second.save()
+        self.assertEqual(self.counters(self.project_1), (0, 0, 1, 1))
+        second.state = "In Progress"
+        second.save()
+        first.delete()
+        self.assertEqual(self.counters(self.project_1), (0, 0, 0, 0))
+
+    def test_moves(self):
+        self.issue_1.project = self.project_2
+        self.issue_1.save()
+        self.assertEqual(self.counters(self.project_1), (0, 0, 0, 0))
+        self.assertEqual(self.counters(self.project_2), (1, 0, 0, 1))
+
+        issue_2: Issue = Issue.objects.create(project=self.project_1, author=self.contributor_1)
+        comment: Comment = Comment.objects.get(id=11111)
+        comment.issue = issue_2
+        comment.save()
+        self.assertEqual(self.counters(self.project_1), (1, 0, 0, 1))
+        self.assertEqual(self.counters(self.project_2), (1, 0, 0, 0))
+        self.assertEqual(Issue.objects.get(id=77777).comment_count, 0)
+        self.assertEqual(Issue.objects.get(id=issue_2.id).comment_count, 1)
+
+    def test_bulk_create(self):
+        response: Response = self.client.post('/api/Issue/bulk/', [
+            {"project": 99999, "state": "Finished"},
+            {"project": 88888},
+        ], format="json")
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post('/api/Comment/bulk/', [
+            {"issue": 77777, "description": "Bulk 1"},
+            {"issue": 77777, "description": "Bulk 2"},
+        ], format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.counters(self.project_1), (1, 0, 1, 3))
+        self.assertEqual(self.counters(self.project_2), (1, 0, 0, 0))
+        self.assertEqual(Issue.objects.get(id=77777).comment_count, 3)
+
+    def test_cascades(self):
+        Comment.objects.create(issue=self.issue_1, author=self.contributor_1)
+        issue_2: Issue = Issue.objects.create(project=self.project_1, author=self.contributor_1, state="Finished")
+        Comment.objects.create(issue=issue_2, author=self.contributor_1)
+        self.assertEqual(self.counters(self.project_1), (1, 0, 1, 3))
+        self.issue_1.delete()
+        self.assertEqual(self.counters(self.project_1), (0, 0, 1, 1))
+        self.project_1.delete()
+        self.assertEqual(self.counters(self.project_2), (0, 0, 0, 0))
+
+    def test_serialized(self):
+        response: Response = self.client.get('/api/Project/99999/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [response.data[field] for field in
+             ("todo_issue_count", "in_progress_issue_count", "finished_issue_count", "comment_count")],
+            [1, 0, 0, 1],
+        )
+        self.assertIn("last_activity_time", response.data)
+        response = self.client.get('/api/Issue/77777/')
+        self.assertEqual(response.data["comment_count"], 1)
+        self.assertIn("last_activity_time", response.data)
+
+    def test_recount_command(self):
+        self.assertIn("0 issues and 0 projects repaired", self.recount())
+        latest: Comment = Comment.objects.get(id=11111)
+        Project.objects.filter(id=99999).update(
+            todo_issue_count=5, comment_count=-2, last_activity_time=latest.created_time - timedelta(days=1)
+        )
+        Issue.objects.filter(id=77777).update(comment_count=3)
+
+        self.assertIn("1 issues and 1 projects drifted", self.recount("--dry-run"))
+        self.assertEqual(self.counters(self.project_1), (5, 0, 0, -2))
+        self.assertIn("1 issues and 1 projects repaired", self.recount())
+        self.assertEqual(self.counters(self.project_1), (1, 0, 0, 1))
+        self.assertEqual(Issue.objects.get(id=77777).comment_count, 1)
+        self.assertGreaterEqual(self.project_1.last_activity_time, latest.created_time)
+        self.assertIn("0 issues and 0 projects repaired", self.recount())
+
+    @staticmethod
+    def recount(*args: str) -> str:
+        output = StringIO()
+        call_command("recount_counters", *args, stdout=output)
+        return output.getvalue()
@@ -0,0 +1,14 @@
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+
+
+@skipUnless(connection.vendor == "sqlite", "SQLite profile")
+class SQLiteProfileTest(TestCase):
+    def test_pragmas_applied(self):
+        pragmas: dict = connection.settings_dict["PRAGMAS"]
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], pragmas["busy_timeout"])
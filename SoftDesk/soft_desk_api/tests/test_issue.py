@@ -1,7 +1,16 @@
+import json
+from unittest.mock import patch
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
-from ..models import Contributor, Issue, Project
+from ..models import Contributor, Issue, Project, Comment
+from ..representation import CompiledRepresentationMixin
+from ..serializers import IssueSerializer
+from ..caching import get_version
+from ..pagination import CustomLimitOffsetPagination
 from django.contrib.auth.models import User
 
 
@@ -68,6 +77,98 @@ class IssueAPI(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data.get("count"), 3)
 
+    def test_issue_get_list_cursor(self):
+        response: Response = self.client.get('/api/Issue/?cursor=&limit=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data.get("count"))
+        self.assertIsNone(response.data.get("previous"))
+        first_page = [issue["id"] for issue in response.data.get("results")]
+        self.assertEqual(first_page, [77777, 66666])
+
+        response: Response = self.client.get(response.data.get("next"))
+        self.assertEqual([issue["id"] for issue in response.data.get("results")], [55555])
+        self.assertIsNone(response.data.get("next"))
+
+        response: Response = self.client.get(response.data.get("previous"))
+        self.assertEqual([issue["id"] for issue in response.data.get("results")], first_page)
+        self.assertIsNone(response.data.get("previous"))
+
+    def test_issue_get_list_cursor_with_count(self):
+        response: Response = self.client.get('/api/Issue/?cursor=&count=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.get("count"), 3)
+        self.assertEqual(len(response.data.get("results")), 3)
+
+    def test_issue_get_list_invalid_cursor(self):
+        response: Response = self.client.get('/api/Issue/?cursor=invalid')
+        self.assertEqual(response.status_code, 404)
+
+    def test_issue_get_list_count_cached(self):
+        self.client.get('/api/Issue/')
+        with CaptureQueriesContext(connection) as context:
+            response: Response = self.client.get('/api/Issue/?offset=1')
+        self.assertEqual(response.data.get("count"), 3)
+        self.assertFalse(any('"__count"' in query["sql"] for query in context.captured_queries))
+
+        Issue.objects.create(project_id=99999, author=self.contributor_1)
+        response: Response = self.client.get('/api/Issue/')
+        self.assertEqual(response.data.get("count"), 4)
+
+    def test_issue_get_list_count_expired_again_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Issue.objects.create(project_id=99999, author=self.contributor_1)
+                # counts cached meanwhile by other requests, from the rows still committed, use this version
+                version: int = get_version("count:soft_desk_api.issue")
+        self.assertGreater(get_version("count:soft_desk_api.issue"), version)
+
+    @patch.object(CustomLimitOffsetPagination, "estimated_count_threshold", 2)
+    @patch("soft_desk_api.pagination.estimate_count", return_value=1000)
+    def test_issue_get_list_estimated_count(self, estimate_count):
+        response: Response = self.client.get('/api/Issue/')
+        self.assertEqual(response.data.get("count"), 1000)
+        self.assertEqual(response.headers.get("X-Count-Estimated"), "true")
+        self.assertEqual(len(response.data.get("results")), 3)
+
+    def list_ids(self, query: str) -> list[int]:
+        response: Response = self.client.get(f'/api/Issue/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [issue["id"] for issue in response.data.get("results")]
+
+    def test_issue_get_list_filtered(self):
+        self.assertEqual(self.list_ids('project=99999'), [77777, 66666, 55555])
+        self.assertEqual(self.list_ids('project=33333'), [])
+        self.assertEqual(self.list_ids('state=In Progress'), [66666, 55555])
+        self.assertEqual(self.list_ids('priority=LOW'), [77777])
+        self.assertEqual(self.list_ids('label=FEATURE&assigned_contributor=' + str(self.contributor_1.id)), [55555])
+        Issue.objects.filter(id=77777).update(created_time="2020-01-01T00:00:00Z")
+        self.assertEqual(self.list_ids('created_time_before=2021-01-01T00:00:00Z'), [77777])
+        self.assertEqual(self.list_ids('created_time_after=2021-01-01'), [66666, 55555])
+
+    def test_issue_get_list_ordering(self):
+        self.assertEqual(self.list_ids('ordering=-created_time'), [55555, 66666, 77777])
+        self.assertEqual(self.list_ids('ordering=created_time&cursor='), [77777, 66666, 55555])
+        response: Response = self.client.get('/api/Issue/?ordering=-created_time&cursor=')
+        self.assertEqual(response.status_code, 400)
+
+    def test_issue_get_list_invalid_filters(self):
+        response: Response = self.client.get('/api/Issue/?state=Closed&project=a&ordering=priority')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {"state", "project", "ordering"})
+        response: Response = self.client.get('/api/Issue/?created_time_after=yesterday')
+        self.assertEqual(response.status_code, 400)
+
+    def test_issue_get_list_stream(self):
+        for _ in range(3):
+            Issue.objects.create(project_id=99999, author=self.contributor_1)
+        paginated: Response = self.client.get('/api/Issue/?limit=2')
+        response = self.client.get('/api/Issue/?stream=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        issues: list = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(issues), 6)
+        self.assertEqual(issues[:2], json.loads(json.dumps(paginated.data["results"])))
+
     def test_issue_get_obj_from_author(self):
         response: Response = self.client.get('/api/Issue/66666/')
         self.assertEqual(response.status_code, 200)
@@ -78,6 +179,30 @@ class IssueAPI(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data.get("id"), 55555)
 
+    def test_issue_get_list_not_modified(self):
+        etag = self.client.get('/api/Issue/').headers["ETag"]
+        response: Response = self.client.get('/api/Issue/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response: Response = self.client.get('/api/Issue/?limit=1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        issue = Issue.objects.get(pk=77777)
+        issue.state = "Finished"
+        issue.save()
+        response: Response = self.client.get('/api/Issue/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_issue_get_obj_sparse_fields(self):
+        response: Response = self.client.get('/api/Issue/77777/?fields=id,state,comments&expand=')
+        self.assertEqual(response.data, {"id": 77777, "state": "TO DO", "comments": []})
+
+    def test_issues_compiled_representation_matches_drf(self):
+        Comment.objects.create(issue_id=77777, author=self.contributor_2, description="Some words")
+        instances = list(IssueSerializer.setup_eager_loading(Issue.objects.all()))
+        compiled = JSONRenderer().render(IssueSerializer(instances, many=True).data)
+        with patch.object(CompiledRepresentationMixin, "compiled_representation", False):
+            drf = JSONRenderer().render(IssueSerializer(instances, many=True).data)
+        self.assertEqual(compiled, drf)
+
     def test_issue_post_minimal_data(self):
         data = {"project": 99999}
         response: Response = self.client.post('/api/Issue/', data=data)
@@ -122,6 +247,53 @@ class IssueAPI(APITestCase):
         response: Response = self.client.post('/api/Issue/', data=data)
         self.assertEqual(response.status_code, 403)
 
+    def test_issue_post_does_not_load_project_team(self):
+        project = Project.objects.get(pk=99999)
+        for i in range(20):
+            project.contributors.add(Contributor.objects.create(user=User.objects.create(username=f"team{i}")))
+        self.client.get('/api/Issue/77777/')
+        data = {"project": 99999, "assigned_contributor": "user2"}
+        with CaptureQueriesContext(connection) as context:
+            response: Response = self.client.post('/api/Issue/', data=data)
+        self.assertEqual(response.status_code, 201)
+        team_queries = [query["sql"] for query in context.captured_queries
+                        if '"soft_desk_api_project_contributors"."project_id" = 99999' in query["sql"]]
+        self.assertEqual(len(team_queries), 1)
+        self.assertIn("LIMIT 1", team_queries[0])
+
+    def test_issue_bulk_post(self):
+        data = [{"project": 99999}, {"project": 99999, "assigned_contributor": "user2", "label": "BUG"}]
+        response: Response = self.client.post('/api/Issue/bulk/', data=data, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([result["status"] for result in response.data], [201, 201])
+        new_issue = Issue.objects.get(pk=response.data[1]["id"])
+        self.assertEqual(new_issue.author, self.contributor_1)
+        self.assertEqual(new_issue.assigned_contributor, self.contributor_2)
+        self.assertEqual(new_issue.label, "BUG")
+        self.assertIsNotNone(new_issue.created_time)
+
+    def test_issue_bulk_post_partial_errors(self):
+        data = [{"project": 99999}, {"project": 33333}, {"project": 99999, "assigned_contributor": "unknown"}]
+        response: Response = self.client.post('/api/Issue/bulk/', data=data, format="json")
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result["status"] for result in response.data], [201, 403, 400])
+        self.assertTrue(Issue.objects.filter(pk=response.data[0]["id"]).exists())
+        self.assertEqual(Issue.objects.count(), 5)
+
+    def test_issue_bulk_post_constant_queries(self):
+        def count_queries(size):
+            data = [{"project": 99999, "assigned_contributor": "user2"}] * size
+            with CaptureQueriesContext(connection) as context:
+                response: Response = self.client.post('/api/Issue/bulk/', data=data, format="json")
+            self.assertEqual(response.status_code, 201)
+            return len(context.captured_queries)
+        count_queries(1)  # warms the caller's project membership cache
+        self.assertEqual(count_queries(2), count_queries(50))
+
+    def test_issue_bulk_post_not_a_list(self):
+        response: Response = self.client.post('/api/Issue/bulk/', data={"project": 99999}, format="json")
+        self.assertEqual(response.status_code, 400)
+
     def test_issue_put_obj(self):
         data = {
             "project": 99999, "assigned_contributor": "user2", "author": self.contributor_1,
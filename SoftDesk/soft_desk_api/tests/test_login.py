@@ -0,0 +1,61 @@
+from unittest.mock import patch
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from ..models import Contributor, Project
+from ..throttling import ClientLoginThrottle, UsernameLoginThrottle
+from django.contrib.auth.models import User
+
+TUNED_PBKDF2 = 'soft_desk_api.hashers.TunedPBKDF2PasswordHasher'
+MD5 = 'django.contrib.auth.hashers.MD5PasswordHasher'
+
+
+@override_settings(PASSWORD_HASHERS=[TUNED_PBKDF2, MD5], PASSWORD_ITERATIONS=1000)
+class LoginAPI(APITestCase):
+    def setUp(self):
+        cache.clear()  # throttle history
+        self.user = User.objects.create_user(username='user1', password='pass1')
+        Contributor.objects.create(user=self.user)
+
+    def login(self, username='user1', password='pass1') -> Response:
+        return self.client.post('/api/token/', data={"username": username, "password": password})
+
+    def test_iterations_from_settings(self):
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+        with self.settings(PASSWORD_ITERATIONS=None):
+            self.assertTrue(make_password("pass").startswith("pbkdf2_sha256$1000000$"))
+
+    def test_login_rehashes_other_rounds(self):
+        with self.settings(PASSWORD_ITERATIONS=2000):
+            response: Response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+    def test_login_upgrades_other_hasher(self):
+        self.user.password = make_password('pass1', hasher='md5')
+        self.user.save()
+        project = Project.objects.create(name="a", author=self.user.contributor)
+        version: int = Project.objects.get(pk=project.pk).version
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+        self.assertEqual(Project.objects.get(pk=project.pk).version, version)  # nothing rendered changed
+
+    @patch.object(UsernameLoginThrottle, "THROTTLE_RATES", {"login_username": "2/minute"})
+    def test_throttled_per_username(self):
+        self.assertEqual(self.login(password='wrong').status_code, 401)
+        self.assertEqual(self.login(password='wrong').status_code, 401)
+        response: Response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        User.objects.create_user(username='user2', password='pass2')
+        self.assertEqual(self.login('user2', 'pass2').status_code, 200)
+
+    @patch.object(ClientLoginThrottle, "THROTTLE_RATES", {"login_client": "2/minute"})
+    def test_throttled_per_client(self):
+        self.assertEqual(self.login('a', 'wrong').status_code, 401)
+        self.assertEqual(self.login('b', 'wrong').status_code, 401)
+        self.assertEqual(self.login().status_code, 429)
@@ -1,7 +1,17 @@
+import csv
+import json
+from unittest.mock import patch
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
-from ..models import Contributor, Project
+from ..models import Contributor, Project, Issue, Comment
+from ..permissions import project_ids_cache_key
+from ..representation import CompiledRepresentationMixin, plans
+from ..serializers import ProjectSerializer
 from django.contrib.auth.models import User
 
 
@@ -44,16 +54,231 @@ class ProjectAPI(APITestCase):
         project_4.contributors.add(self.contributor_1)
         project_4.contributors.add(self.contributor_2)
 
+    def add_projects(self, count):
+        for i in range(count):
+            user = User.objects.create(username=f"seed{Project.objects.count()}")
+            contributor = Contributor.objects.create(user=user)
+            project = Project.objects.create(name="seed", author=contributor)
+            project.contributors.add(self.contributor_1, contributor)
+            issue = Issue.objects.create(project=project, author=contributor,
+                                         assigned_contributor=self.contributor_1)
+            Comment.objects.create(issue=issue, author=contributor, description="seed")
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response: Response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_projects_get_list_constant_queries(self):
+        self.add_projects(2)
+        small_page = self.count_queries('/api/Project/')
+        self.add_projects(10)
+        large_page = self.count_queries('/api/Project/')
+        self.assertEqual(small_page, large_page)
+
+    def test_project_get_obj_constant_queries(self):
+        small_project = self.count_queries('/api/Project/99999/')
+        self.add_projects(10)
+        Project.objects.get(pk=99999).contributors.add(*Contributor.objects.all())
+        large_project = self.count_queries('/api/Project/99999/')
+        self.assertEqual(small_project, large_project)
+
     def test_projects_get_list(self):
         response: Response = self.client.get('/api/Project/')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data.get("count"), 3)
 
+    def test_projects_get_list_stream_not_cached(self):
+        response = self.client.get('/api/Project/?stream=1&fields=id')
+        self.assertCountEqual(json.loads(b"".join(response.streaming_content)),
+                              [{"id": 99999}, {"id": 88888}, {"id": 66666}])
+        response = self.client.get('/api/Project/?stream=1&fields=id')
+        self.assertEqual(len(json.loads(b"".join(response.streaming_content))), 3)
+
     def test_project_get_obj(self):
         response: Response = self.client.get('/api/Project/99999/')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data.get("id"), 99999)
 
+    def test_project_get_obj_membership_cached(self):
+        cold = self.count_queries('/api/Project/99999/')
+        warm = self.count_queries('/api/Project/88888/')  # same shape, response not cached yet
+        self.assertEqual(warm, cold - 1)
+
+        Project.objects.get(pk=99999).contributors.remove(self.contributor_1)
+        response: Response = self.client.get('/api/Project/99999/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_project_get_obj_membership_recached_during_removal(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Project.objects.get(pk=66666).contributors.remove(self.contributor_1)
+                # a read running meanwhile still sees the membership committed before
+                cache.set(project_ids_cache_key(self.contributor_1.id), frozenset({99999, 88888, 66666}))
+        response: Response = self.client.get('/api/Project/66666/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_project_get_obj_response_cached(self):
+        self.client.get('/api/Project/99999/')
+        with self.assertNumQueries(3):  # user, contributor and ETag validators
+            response: Response = self.client.get('/api/Project/99999/')
+        self.assertEqual(response.data.get("name"), "a")
+
+        project = Project.objects.get(pk=99999)
+        project.name = "new_name"
+        project.save()
+        self.assertEqual(self.client.get('/api/Project/99999/').data.get("name"), "new_name")
+        self.user_1.username = "new_username"
+        self.user_1.save()
+        self.assertEqual(self.client.get('/api/Project/99999/').data["author"]["username"], "new_username")
+
+    def test_project_get_obj_response_kept_across_other_projects_writes(self):
+        self.client.get('/api/Project/99999/')
+        project = Project.objects.get(pk=77777)  # contributor_1 is in none of its payloads
+        project.name = "new_name"
+        project.save()
+        with self.assertNumQueries(3):
+            response: Response = self.client.get('/api/Project/99999/')
+        self.assertEqual(response.data.get("name"), "a")
+
+    def test_project_get_list_response_cached_per_user(self):
+        self.client.get('/api/Project/')
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.contributor_2).access_token}'
+        )
+        response: Response = self.client.get('/api/Project/')
+        self.assertEqual(response.data.get("count"), 2)
+
+        Project.objects.get(pk=88888).contributors.add(self.contributor_2)
+        response: Response = self.client.get('/api/Project/')
+        self.assertEqual(response.data.get("count"), 3)
+
+    def test_project_get_obj_not_modified(self):
+        response: Response = self.client.get('/api/Project/99999/')
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+        response: Response = self.client.get('/api/Project/99999/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+
+        Issue.objects.create(project_id=99999, author=self.contributor_1)
+        response: Response = self.client.get('/api/Project/99999/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_project_get_obj_not_modified_checks_permission(self):
+        response: Response = self.client.get('/api/Project/77777/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 403)
+
+    def test_project_get_obj_etag_follows_contributors(self):
+        etag = self.client.get('/api/Project/66666/').headers["ETag"]
+        self.user_2.username = "new_username"
+        self.user_2.save()
+        response: Response = self.client.get('/api/Project/66666/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response.headers["ETag"]
+        Project.objects.get(pk=77777).contributors.remove(self.contributor_2)  # nested id lists change
+        response: Response = self.client.get('/api/Project/66666/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_project_stale_save_keeps_version(self):
+        stale: Project = Project.objects.get(pk=66666)
+        Project.objects.filter(pk=66666).touch()
+        version: int = Project.objects.get(pk=66666).version
+        stale.name = "renamed"
+        stale.save()
+        self.assertGreater(Project.objects.get(pk=66666).version, version)
+
+    def test_projects_get_list_not_modified(self):
+        etag = self.client.get('/api/Project/').headers["ETag"]
+        response: Response = self.client.get('/api/Project/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Project.objects.get(pk=77777).contributors.add(self.contributor_1)
+        response: Response = self.client.get('/api/Project/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data.get("count"), 4)
+
+    def test_projects_get_list_sparse_fields(self):
+        self.add_projects(5)
+        full = self.count_queries('/api/Project/')
+        sparse = self.count_queries('/api/Project/?fields=id,name')
+        self.assertLess(sparse, full - 5)
+        response: Response = self.client.get('/api/Project/?fields=id,name')
+        self.assertEqual(set(response.data["results"][0]), {"id", "name"})
+
+    def test_project_get_obj_expand(self):
+        Issue.objects.create(id=12345, project_id=66666, author=self.contributor_1)
+        response: Response = self.client.get('/api/Project/66666/?expand=')
+        self.assertEqual(response.data["author"], self.contributor_2.id)
+        self.assertEqual(sorted(response.data["contributors"]), [self.contributor_1.id, self.contributor_2.id])
+        self.assertEqual(response.data["issues"], [12345])
+
+        response: Response = self.client.get('/api/Project/66666/?expand=author')
+        self.assertEqual(response.data["author"]["username"], "user2")
+        self.assertEqual(response.data["issues"], [12345])
+
+    def test_project_get_obj_nested_fields(self):
+        response: Response = self.client.get('/api/Project/66666/?fields=id,contributors.username')
+        self.assertEqual(set(response.data), {"id", "contributors"})
+        self.assertCountEqual(response.data["contributors"], [{"username": "user1"}, {"username": "user2"}])
+
+    def test_project_post_ignores_sparse_fields(self):
+        response: Response = self.client.post('/api/Project/?fields=id', data={"name": "new"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["name"], "new")
+
+    def test_projects_compiled_representation_matches_drf(self):
+        self.add_projects(3)
+        instances = list(ProjectSerializer.setup_eager_loading(Project.objects.all()))
+        compiled = JSONRenderer().render(ProjectSerializer(instances, many=True).data)
+        with patch.object(CompiledRepresentationMixin, "compiled_representation", False):
+            drf = JSONRenderer().render(ProjectSerializer(instances, many=True).data)
+        self.assertEqual(compiled, drf)
+
+    def test_projects_compiled_plans_bounded_by_fields(self):
+        self.client.get('/api/Project/?fields=id,name')
+        count: int = len(plans)
+        for index in range(5):
+            response: Response = self.client.get(f'/api/Project/?fields=id,name,junk{index}')
+            self.assertEqual(set(response.data["results"][0]), {"id", "name"})
+        self.assertEqual(len(plans), count)
+        for plan in filter(None, plans.values()):
+            for _, getter, convert in plan:
+                self.assertNotIsInstance(getattr(convert, "__self__", None), ProjectSerializer)
+
+    def test_project_export_ndjson(self):
+        issue = Issue.objects.create(project_id=66666, author=self.contributor_2,
+                                     assigned_contributor=self.contributor_1)
+        Comment.objects.create(issue=issue, author=self.contributor_1, description="Some words")
+        Comment.objects.create(issue=issue, author=self.contributor_2, description="Other, words")
+        Issue.objects.create(project_id=66666, author=self.contributor_1)
+        response = self.client.get('/api/Project/66666/export/')
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines: list[dict] = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(len(lines), 2)
+        expected = self.client.get(f'/api/Issue/{issue.id}/?expand=comments')
+        self.assertEqual(lines[0], json.loads(expected.content))
+        self.assertEqual(lines[1]["comments"], [])
+
+    def test_project_export_csv(self):
+        issue = Issue.objects.create(project_id=66666, author=self.contributor_2)
+        Comment.objects.create(issue=issue, author=self.contributor_1, description="Some, words")
+        Comment.objects.create(issue=issue, author=self.contributor_2, description="Other words")
+        Issue.objects.create(project_id=66666, author=self.contributor_1)
+        response = self.client.get('/api/Project/66666/export/?format=csv')
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows: list[list[str]] = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:2], ["issue_id", "issue_project"])
+        self.assertEqual(len(rows), 4)  # header, two comments, one issue without comments
+        self.assertEqual(rows[1][rows[0].index("comment_description")], "Some, words")
+        self.assertEqual(rows[3][rows[0].index("comment_id")], "")
+
+    def test_project_export_not_permitted(self):
+        response = self.client.get('/api/Project/77777/export/?format=csv')
+        self.assertEqual(response.status_code, 403)
+
     def test_project_post_minimal_data(self):
         data = {"name": "e"}
         response: Response = self.client.post('/api/Project/', data=data)
@@ -80,6 +305,27 @@ class ProjectAPI(APITestCase):
         self.assertIn(self.contributor_1, new_project.contributors.all())
         self.assertIn(self.contributor_2, new_project.contributors.all())
 
+    def test_project_post_unknown_contributor(self):
+        data = {"name": "e", "contributors": "user2, unknown"}
+        response: Response = self.client.post('/api/Project/', data=data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("unknown", response.data["contributors"][0])
+        self.assertFalse(Project.objects.filter(name="e").exists())
+
+    def test_project_post_contributors_constant_queries(self):
+        def count_queries(size):
+            names = [f"team{Contributor.objects.count() + i}" for i in range(size)]
+            for name in names:
+                Contributor.objects.create(user=User.objects.create(username=name))
+            with CaptureQueriesContext(connection) as context:
+                response: Response = self.client.post(
+                    '/api/Project/', data={"name": "e", "contributors": ",".join(names)}
+                )
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(len(response.data["contributors"]), size + 1)
+            return len(context.captured_queries)
+        self.assertEqual(count_queries(1), count_queries(10))
+
     def test_project_put_obj(self):
         data = {"name": "new_name", "description": "aaa", "author": self.contributor_1}
         response: Response = self.client.put('/api/Project/99999/', data=data)
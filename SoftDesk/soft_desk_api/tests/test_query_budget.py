@@ -0,0 +1,182 @@
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from .query_budget import QueryBudgetMixin
+from ..views import ContributorViewSet, ProjectViewSet, IssueViewSet, CommentViewSet, SearchViewSet
+
+
+class QueryBudgetAPI(QueryBudgetMixin, APITestCase):
+    def test_contributor_list(self):
+        self.assertQueryBudget(
+            ContributorViewSet, "list", lambda seeded: self.client.get('/api/Contributor/')
+        )
+
+    def test_contributor_retrieve(self):
+        self.assertQueryBudget(
+            ContributorViewSet, "retrieve",
+            lambda seeded: self.client.get(f'/api/Contributor/{self.contributor.id}/')
+        )
+
+    def test_contributor_create(self):
+        self.assertQueryBudget(
+            ContributorViewSet, "create",
+            lambda seeded: self.client.post('/api/Contributor/', data={
+                "username": f"new_{seeded['teammate'].id}", "password": "mypass", "age": 20
+            })
+        )
+
+    def test_contributor_update(self):
+        def send(seeded):
+            self.authenticate(seeded["teammate"])
+            return self.client.put(f'/api/Contributor/{seeded["teammate"].id}/', data={
+                "username": seeded["teammate"].username, "password": "mypass", "age": 20
+            })
+        self.assertQueryBudget(ContributorViewSet, "update", send)
+
+    def test_contributor_partial_update(self):
+        def send(seeded):
+            self.authenticate(seeded["teammate"])
+            return self.client.patch(f'/api/Contributor/{seeded["teammate"].id}/', data={"age": 20})
+        self.assertQueryBudget(ContributorViewSet, "partial_update", send)
+
+    def test_contributor_destroy(self):
+        def send(seeded):
+            self.authenticate(seeded["teammate"])
+            return self.client.delete(f'/api/Contributor/{seeded["teammate"].id}/')
+        self.assertQueryBudget(ContributorViewSet, "destroy", send)
+
+    def test_project_list(self):
+        self.assertQueryBudget(ProjectViewSet, "list", lambda seeded: self.client.get('/api/Project/'))
+
+    def test_project_retrieve(self):
+        self.assertQueryBudget(
+            ProjectViewSet, "retrieve",
+            lambda seeded: self.client.get(f'/api/Project/{seeded["project"].id}/')
+        )
+
+    def test_project_create(self):
+        self.assertQueryBudget(
+            ProjectViewSet, "create",
+            lambda seeded: self.client.post('/api/Project/', data={
+                "name": "new", "contributors": seeded["teammate"].username
+            })
+        )
+
+    def test_project_update(self):
+        self.assertQueryBudget(
+            ProjectViewSet, "update",
+            lambda seeded: self.client.put(f'/api/Project/{seeded["project"].id}/', data={"name": "new"})
+        )
+
+    def test_project_partial_update(self):
+        self.assertQueryBudget(
+            ProjectViewSet, "partial_update",
+            lambda seeded: self.client.patch(f'/api/Project/{seeded["project"].id}/', data={"name": "new"})
+        )
+
+    def test_project_destroy(self):
+        self.assertQueryBudget(
+            ProjectViewSet, "destroy",
+            lambda seeded: self.client.delete(f'/api/Project/{seeded["project"].id}/')
+        )
+
+    def test_project_export(self):
+        def send(seeded):
+            response: Response = self.client.get(f'/api/Project/{seeded["project"].id}/export/?format=csv')
+            b"".join(response.streaming_content)  # the export query runs while streaming
+            return response
+        self.assertQueryBudget(ProjectViewSet, "export", send)
+
+    def test_issue_list(self):
+        self.assertQueryBudget(IssueViewSet, "list", lambda seeded: self.client.get('/api/Issue/'))
+
+    def test_issue_retrieve(self):
+        self.assertQueryBudget(
+            IssueViewSet, "retrieve",
+            lambda seeded: self.client.get(f'/api/Issue/{seeded["issue"].id}/')
+        )
+
+    def test_issue_create(self):
+        self.assertQueryBudget(
+            IssueViewSet, "create",
+            lambda seeded: self.client.post('/api/Issue/', data={
+                "project": seeded["project"].id, "assigned_contributor": seeded["teammate"].username
+            })
+        )
+
+    def test_issue_bulk(self):
+        self.assertQueryBudget(
+            IssueViewSet, "bulk",
+            lambda seeded: self.client.post('/api/Issue/bulk/', format="json", data=[
+                {"project": seeded["project"].id, "assigned_contributor": seeded["teammate"].username},
+                {"project": seeded["project"].id},
+            ])
+        )
+
+    def test_issue_update(self):
+        self.assertQueryBudget(
+            IssueViewSet, "update",
+            lambda seeded: self.client.put(f'/api/Issue/{seeded["issue"].id}/', data={
+                "project": seeded["project"].id, "state": "In Progress"
+            })
+        )
+
+    def test_issue_partial_update(self):
+        self.assertQueryBudget(
+            IssueViewSet, "partial_update",
+            lambda seeded: self.client.patch(f'/api/Issue/{seeded["issue"].id}/', data={"state": "Finished"})
+        )
+
+    def test_issue_destroy(self):
+        self.assertQueryBudget(
+            IssueViewSet, "destroy",
+            lambda seeded: self.client.delete(f'/api/Issue/{seeded["issue"].id}/')
+        )
+
+    def test_comment_list(self):
+        self.assertQueryBudget(CommentViewSet, "list", lambda seeded: self.client.get('/api/Comment/'))
+
+    def test_comment_retrieve(self):
+        self.assertQueryBudget(
+            CommentViewSet, "retrieve",
+            lambda seeded: self.client.get(f'/api/Comment/{seeded["comment"].id}/')
+        )
+
+    def test_comment_create(self):
+        self.assertQueryBudget(
+            CommentViewSet, "create",
+            lambda seeded: self.client.post('/api/Comment/', data={
+                "issue": seeded["issue"].id, "description": "new"
+            })
+        )
+
+    def test_comment_bulk(self):
+        self.assertQueryBudget(
+            CommentViewSet, "bulk",
+            lambda seeded: self.client.post('/api/Comment/bulk/', format="json", data=[
+                {"issue": seeded["issue"].id, "description": "new"},
+                {"issue": seeded["issue"].id, "description": "new"},
+            ])
+        )
+
+    def test_comment_update(self):
+        self.assertQueryBudget(
+            CommentViewSet, "update",
+            lambda seeded: self.client.put(f'/api/Comment/{seeded["comment"].id}/', data={
+                "issue": seeded["issue"].id, "description": "new"
+            })
+        )
+
+    def test_comment_partial_update(self):
+        self.assertQueryBudget(
+            CommentViewSet, "partial_update",
+            lambda seeded: self.client.patch(f'/api/Comment/{seeded["comment"].id}/', data={"description": "new"})
+        )
+
+    def test_comment_destroy(self):
+        self.assertQueryBudget(
+            CommentViewSet, "destroy",
+            lambda seeded: self.client.delete(f'/api/Comment/{seeded["comment"].id}/')
+        )
+
+    def test_search_list(self):
+        self.assertQueryBudget(SearchViewSet, "list", lambda seeded: self.client.get('/api/search/?q=seed'))
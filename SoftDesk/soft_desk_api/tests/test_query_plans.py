@@ -0,0 +1,49 @@
+import re
+from unittest import skipUnless
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from .query_budget import QueryBudgetMixin
+
+FULL_SCAN = re.compile(r"\bSCAN (?!subquery|CONSTANT ROW)")  # a table read without an index
+
+
+@skipUnless(connection.vendor == "sqlite", "reads SQLite EXPLAIN QUERY PLAN output")
+class QueryPlanAPI(QueryBudgetMixin, APITestCase):
+    """The list queries on issues and comments search indexes instead of scanning the tables"""
+
+    def assertIndexDriven(self, url):
+        self.seed(3)
+        with CaptureQueriesContext(connection) as context:
+            response: Response = self.client.get(url)
+            b"".join(getattr(response, "streaming_content", []))
+        self.assertEqual(response.status_code, 200)
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if not query["sql"].startswith("SELECT") or not re.search(r"_(issue|comment)\b", query["sql"]):
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plan: str = "\n".join(row[-1] for row in cursor.fetchall())
+                self.assertIsNone(FULL_SCAN.search(plan), f"{query['sql']}\n{plan}")
+
+    def test_issue_list(self):
+        self.assertIndexDriven('/api/Issue/')
+
+    def test_issue_list_cursor(self):
+        self.assertIndexDriven('/api/Issue/?cursor=')
+
+    def test_issue_list_filtered(self):
+        for query in (
+            "project=1", "state=TO DO", "priority=LOW&label=BUG", "assigned_contributor=1",
+            "created_time_after=2020-01-01&created_time_before=2030-01-01", "project=1&ordering=-created_time",
+        ):
+            with self.subTest(query=query):
+                self.assertIndexDriven(f'/api/Issue/?{query}')
+
+    def test_comment_list(self):
+        self.assertIndexDriven('/api/Comment/')
+
+    def test_project_export(self):
+        project_id = self.seed(1)["project"].id
+        self.assertIndexDriven(f'/api/Project/{project_id}/export/')
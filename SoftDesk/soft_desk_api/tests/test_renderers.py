@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from json import loads
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from .. import renderers
+from ..renderers import FastJSONRenderer, stream_json
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    data = {
+        "id": 1,
+        "name": "café\u2028\u2029",
+        "created_time": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "price": Decimal("1.50"),
+        "detail": gettext_lazy("Not found."),
+        "results": [{"nested": None, "flag": True}],
+        2: "non-string key",
+    }
+
+    def test_render_matches_drf(self):
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        for value in (0.5, 1e-6, 1e16, 1.2345678901234567e-300, -0.0, 0.1 + 0.2, 2.5e-5):
+            with self.subTest(value=value):
+                data = {"rank": value, "results": [value]}
+                self.assertEqual(loads(FastJSONRenderer().render(data)), loads(JSONRenderer().render(data)))
+
+    def test_render_big_integers_with_drf(self):
+        data = {"id": 2 ** 70, "ids": [-(2 ** 64)]}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_render_indented_matches_drf(self):
+        media_type = "application/json; indent=4"
+        self.assertEqual(FastJSONRenderer().render(self.data, media_type),
+                         JSONRenderer().render(self.data, media_type))
+
+    def test_render_without_orjson(self):
+        with patch.object(renderers, "orjson", None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_render_none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_stream_json(self):
+        items = iter([{"id": 1}, {"id": 2}])
+        self.assertEqual(b"".join(stream_json(items, FastJSONRenderer())), b'[{"id":1},{"id":2}]')
+        self.assertEqual(b"".join(stream_json([], FastJSONRenderer())), b"[]")
@@ -0,0 +1,83 @@
+from unittest.mock import patch
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import override_settings
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Contributor, Project
+from django.contrib.auth.models import User
+
+
+@override_settings(REPLICA_DATABASE="replica")
+class ReplicaRoutingAPI(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        # a second SQLite database standing for the replica, only while this class runs
+        # (declared after the runner collected the test databases and ran its checks);
+        # rows only present on it tell which database answered
+        connections.settings["replica"] = connections.configure_settings({
+            "default": connections["default"].settings_dict,
+            "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": "replica.sqlite3"},
+        })["replica"]
+        cls.replica_name = connections["replica"].settings_dict["NAME"]
+        connections["replica"].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        cls.databases = {"default", "replica"}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].creation.destroy_test_db(cls.replica_name, verbosity=0)
+        del connections["replica"]
+        del connections.settings["replica"]
+
+    def setUp(self):
+        cache.clear()
+        for database in ("default", "replica"):
+            user = User.objects.using(database).create(id=1, username='user1')
+            self.contributor = Contributor.objects.using(database).create(id=1, user=user)
+            Project.objects.using(database).create(id=1, name=database, author=self.contributor)
+            Project.contributors.through.objects.using(database).create(project_id=1, contributor=self.contributor)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.contributor).access_token}'
+        )
+
+    def test_list_and_retrieve_read_replica(self):
+        response: Response = self.client.get('/api/Project/')
+        self.assertEqual(response.data["results"][0]["name"], "replica")
+        response: Response = self.client.get('/api/Project/1/')
+        self.assertEqual(response.data["name"], "replica")
+
+    def test_writes_go_to_primary_and_pin_the_user(self):
+        response: Response = self.client.patch('/api/Project/1/', data={"description": "new"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Project.objects.using("default").get(pk=1).description, "new")
+        self.assertEqual(Project.objects.using("replica").get(pk=1).description, "")
+
+        response: Response = self.client.get('/api/Project/1/')
+        self.assertEqual(response.data["name"], "default")
+        self.assertEqual(response.data["description"], "new")
+
+    def test_unpinned_after_window(self):
+        self.client.patch('/api/Project/1/', data={"description": "new"})
+        cache.clear()  # the pin expired
+        response: Response = self.client.get('/api/Project/1/')
+        self.assertEqual(response.data["name"], "replica")
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_primary_without_replica(self):
+        response: Response = self.client.get('/api/Project/1/')
+        self.assertEqual(response.data["name"], "default")
+
+    def test_membership_read_on_primary(self):
+        Project.contributors.through.objects.using("default").filter(project_id=1).delete()  # not replicated yet
+        response: Response = self.client.get('/api/Project/1/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_counts_from_replica_cached_for_the_lag(self):
+        with patch.object(cache, "set", wraps=cache.set) as cache_set:
+            self.client.get('/api/Project/')
+        timeouts = [call.args[2] for call in cache_set.call_args_list if call.args[0].startswith("count:")]
+        self.assertEqual(timeouts, [settings.REPLICA_PIN_SECONDS])
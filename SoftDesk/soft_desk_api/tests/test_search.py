@@ -0,0 +1,90 @@
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models import Contributor, Issue, Project, Comment
+from django.contrib.auth.models import User
+
+
+class SearchAPI(APITestCase):
+    def setUp(self):
+        self.user_1 = User.objects.create_user(username='user1', password='pass1')
+        self.user_2 = User.objects.create_user(username='user2', password='pass2')
+        self.contributor_1 = Contributor.objects.create(user=self.user_1)
+        self.contributor_2 = Contributor.objects.create(user=self.user_2)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.contributor_1).access_token}')
+
+        self.project_1 = Project.objects.create(
+            id=99999, name="Billing", description="Invoices and payments", author=self.contributor_1
+        )
+        self.project_1.contributors.add(self.contributor_1)
+        project_2 = Project.objects.create(
+            id=88888, name="Payments", description="Not shared", author=self.contributor_2
+        )
+        project_2.contributors.add(self.contributor_2)
+
+        self.issue_1 = Issue.objects.create(id=77777, project=self.project_1, author=self.contributor_1)
+        issue_2 = Issue.objects.create(id=66666, project=project_2, author=self.contributor_2)
+        Comment.objects.create(
+            id=11111, issue=self.issue_1, author=self.contributor_1,
+            description="Failed payments are retried, payments twice"
+        )
+        Comment.objects.create(id=22222, issue=self.issue_1, author=self.contributor_1, description="Unrelated")
+        Comment.objects.create(id=33333, issue=issue_2, author=self.contributor_2, description="payments")
+
+    def search(self, q: str, **params) -> Response:
+        return self.client.get('/api/search/', {"q": q, **params})
+
+    def hits(self, q: str) -> list[tuple[str, int]]:
+        response: Response = self.search(q)
+        self.assertEqual(response.status_code, 200)
+        return [(hit["type"], hit["id"]) for hit in response.data["results"]]
+
+    def test_ranked_hits_of_own_projects(self):
+        response: Response = self.search("payments")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(response.data["results"][0], {
+            "type": "comment", "id": 11111, "project": 99999, "issue": 77777,
+            "rank": response.data["results"][0]["rank"]
+        })
+        self.assertEqual(response.data["results"][1]["type"], "project")
+        self.assertEqual(response.data["results"][1]["issue"], None)
+        self.assertGreater(response.data["results"][0]["rank"], response.data["results"][1]["rank"])
+
+    def test_every_word_stemmed(self):
+        self.assertEqual(self.hits("payment retry"), [("comment", 11111)])
+        self.assertEqual(self.hits("billing"), [("project", 99999)])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.hits('payment" OR "unrelated'), [])
+        self.assertEqual(self.hits('unrelated*'), [("comment", 22222)])
+
+    def test_empty_query(self):
+        for q in ("", "  ", "!?"):
+            with self.subTest(q=q):
+                response: Response = self.search(q)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("q", response.data)
+
+    def test_paginated(self):
+        response: Response = self.search("payments", limit=1, offset=1)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual([hit["type"] for hit in response.data["results"]], ["project"])
+        self.assertIsNotNone(response.data["previous"])
+
+    def test_index_follows_changes(self):
+        comment: Comment = Comment.objects.get(id=22222)
+        comment.description = "Refund payments"
+        comment.save()
+        self.assertIn(("comment", 22222), self.hits("refund"))
+        comment.delete()
+        self.assertEqual(self.hits("refund"), [])
+        self.client.post('/api/Comment/bulk/', [{"issue": 77777, "description": "Bulk refund"}], format="json")
+        self.assertEqual(len(self.hits("refund")), 1)
+        self.project_1.delete()
+        self.assertEqual(self.hits("payments"), [])
+
+    def test_membership_change(self):
+        self.assertEqual(self.hits("shared"), [])
+        Project.objects.get(id=88888).contributors.add(self.contributor_1)
+        self.assertEqual(self.hits("shared"), [("project", 88888)])
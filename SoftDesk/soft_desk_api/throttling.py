@@ -0,0 +1,21 @@
+from hashlib import md5
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class UsernameLoginThrottle(SimpleRateThrottle):
+    """Token requests per submitted username, from any client (`login_username` rate)"""
+    scope = "login_username"
+
+    def get_cache_key(self, request, view):
+        username = request.data.get("username") if hasattr(request.data, "get") else None
+        if not isinstance(username, str) or not username:
+            return None  # rejected by the serializer, still counted per client
+        return self.cache_format % {"scope": self.scope, "ident": md5(username.encode()).hexdigest()}
+
+
+class ClientLoginThrottle(SimpleRateThrottle):
+    """Token requests per client address, for any username (`login_client` rate)"""
+    scope = "login_client"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ContributorViewSet, ProjectViewSet, IssueViewSet, CommentViewSet, CustomTokenObtainPairView
+from .views import ContributorViewSet, ProjectViewSet, IssueViewSet, CommentViewSet, CustomTokenObtainPairView, \
+    AsyncReadView, SearchViewSet
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
 
@@ -9,10 +10,19 @@ router.register(r'Contributor', ContributorViewSet)
 router.register(r'Project', ProjectViewSet)
 router.register(r'Issue', IssueViewSet)
 router.register(r'Comment', CommentViewSet)
+router.register(r'search', SearchViewSet, basename='search')
+
+# async list/retrieve of the same endpoints, for ASGI deployments
+async_urlpatterns = [
+    path(f'{prefix}/{suffix}', AsyncReadView.as_view(viewset_class=viewset), name=f'async-{prefix.lower()}-{name}')
+    for prefix, viewset in (('Project', ProjectViewSet), ('Issue', IssueViewSet), ('Comment', CommentViewSet))
+    for suffix, name in (('', 'list'), ('<pk>/', 'detail'))
+]
 
 
 urlpatterns = [
     path('api/', include(router.urls)),
+    path('api/async/', include(async_urlpatterns)),
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='schema-swagger-ui'),
@@ -1,23 +1,159 @@
-from django.db.models import QuerySet
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.viewsets import ModelViewSet
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import QuerySet, Q
+from django.http import Http404, StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed, PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from rest_framework.views import APIView
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.response import Response
-from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_404_NOT_FOUND
-from .permissions import IsContributorOrOwner, IsOwnerOrReadOnly
-from .models import Contributor, Project, Issue, Comment
+from rest_framework.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_207_MULTI_STATUS, \
+    HTTP_400_BAD_REQUEST, HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND
+from .caching import CachedResponseMixin, ConditionalGetMixin
+from .counters import count_comments, count_created_issues
+from .pagination import invalidate_counts
+from .exports import CSV_HEADER, iter_csv_rows, iter_issues
+from .filters import IssueFilterBackend
+from .search import SearchResults, search_terms, update_search_index
+from .routers import ais_pinned_to_primary, is_pinned_to_primary, pin_to_primary, replica_reads
+from .renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer, stream_csv, stream_json, stream_ndjson
+from .permissions import IsContributorOrOwner, IsOwnerOrReadOnly, aget_project_ids
+from .throttling import ClientLoginThrottle, UsernameLoginThrottle
+from .models import Contributor, Project, Issue, Comment, User, touch_projects
 from .serializers import ContributorSerializer, ProjectSerializer, \
-    IssueSerializer, CommentSerializer
+    IssueSerializer, CommentSerializer, FieldSelection, ContributorTokenObtainPairSerializer, SearchHitSerializer
 
 
-class ContributorViewSet(ModelViewSet):
+class ReplicaReadMixin:
+    """
+    Runs list and retrieve against the read replica, unless the user wrote within the
+    last REPLICA_PIN_SECONDS: successful writes pin their author to the primary.
+    Bodies streamed after the view returns are read from the primary.
+    """
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)  # authenticates on the primary
+        if request.method in SAFE_METHODS and self.action in self.replica_actions \
+                and not is_pinned_to_primary(request.user.pk):
+            self.replica_token = replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if getattr(self, "replica_token", None) is not None:
+            replica_reads.reset(self.replica_token)
+            self.replica_token = None
+        if request.method not in SAFE_METHODS and response.status_code < 400 and request.user.is_authenticated:
+            pin_to_primary(request.user.pk)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class BulkCreateMixin:
+    """
+    POST /endpoint/bulk/ with a list of objects: each item is validated by the usual
+    serializer, sharing related lookups and membership checks through `lookup_cache`,
+    then the valid ones are inserted with one bulk_create. Answers one result per item.
+    """
+    bulk_create_max_items = 1000
+
+    def get_lookup_cache(self, items: list[dict]) -> dict:
+        """Related objects referenced by `items`, keyed by (model, submitted value)"""
+        return {}
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError("Expected a non-empty list of objects.")
+        if len(items) > self.bulk_create_max_items:
+            raise ValidationError(f"At most {self.bulk_create_max_items} objects per request.")
+        if not all(isinstance(item, dict) for item in items):
+            raise ValidationError("Expected a list of objects.")
+
+        context = {**self.get_serializer_context(), "lookup_cache": self.get_lookup_cache(items)}
+        results: list[dict] = []
+        valid_serializers = []
+        for item in items:
+            serializer = self.get_serializer_class()(data=item, context=context)
+            try:
+                if serializer.is_valid():
+                    valid_serializers.append(serializer)
+                    results.append({"status": HTTP_201_CREATED})
+                else:
+                    results.append({"status": HTTP_400_BAD_REQUEST, "errors": serializer.errors})
+            except PermissionDenied as exc:
+                results.append({"status": HTTP_403_FORBIDDEN, "errors": {"detail": exc.detail}})
+
+        created = self.perform_bulk_create(valid_serializers)
+        created_results = (result for result in results if result["status"] == HTTP_201_CREATED)
+        for result, instance in zip(created_results, created):
+            result["id"] = instance.id
+
+        if len(created) == len(items):
+            status = HTTP_201_CREATED
+        elif created:
+            status = HTTP_207_MULTI_STATUS
+        else:
+            status = HTTP_400_BAD_REQUEST
+        return Response(results, status=status)
+
+    def perform_bulk_create(self, serializers) -> list:
+        model = self.get_serializer_class().Meta.model
+        with transaction.atomic():
+            created = model.objects.bulk_create(
+                [model(**serializer.validated_data) for serializer in serializers]
+            )
+            if model is Issue:  # bulk_create sends no post_save
+                count_created_issues(*created)
+            elif created:
+                count_comments(*created)
+        if created:
+            invalidate_counts(model)  # bulk_create sends no post_save
+            touch_projects(*created)
+            update_search_index(model, *created)
+        return created
+
+
+class StreamingListMixin:
+    """
+    GET /endpoint/?stream=true answers the whole filtered list, unpaginated, as a JSON
+    array streamed from a chunked queryset iterator: memory stays flat whatever its size.
+    """
+    stream_query_param = "stream"
+    stream_chunk_size = 500
+
+    def is_streamed(self, request) -> bool:
+        return request.query_params.get(self.stream_query_param, "").lower() in ("1", "true")
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_streamed(request):
+            return super().list(request, *args, **kwargs)
+        queryset: QuerySet = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        rows = (serializer.to_representation(obj) for obj in queryset.iterator(self.stream_chunk_size))
+        return StreamingHttpResponse(
+            stream_json(rows, FastJSONRenderer()), content_type=FastJSONRenderer.media_type
+        )
+
+
+class ContributorViewSet(ReplicaReadMixin, StreamingListMixin, ModelViewSet):
     queryset = Contributor.objects.all()
     serializer_class = ContributorSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    query_budgets = {  # SQL queries per action, enforced by tests/test_query_budget.py
+        "list": 2, "retrieve": 1, "create": 7, "update": 14, "partial_update": 8, "destroy": 15
+    }
 
     def get_queryset(self):
+        selection = FieldSelection.from_request(self.request)  # ?fields= and ?expand=
         if self.action == "list":
-            return Contributor.objects.all()
+            return ContributorSerializer.setup_eager_loading(Contributor.objects.all(), selection)
+        elif self.action == "retrieve":
+            return ContributorSerializer.setup_eager_loading(
+                Contributor.objects.filter(id=self.kwargs.get("pk")), selection
+            )
         else:
             return Contributor.objects.filter(id=self.kwargs.get("pk"))
 
@@ -30,60 +166,241 @@ class ContributorViewSet(ModelViewSet):
             return Response(status=HTTP_404_NOT_FOUND)
 
 
-class ProjectViewSet(ModelViewSet):
+class ProjectViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, StreamingListMixin, ModelViewSet):
     queryset = Project.objects.none()  # redefined in get_queryset()
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated, IsContributorOrOwner]
+    export_chunk_size = 2000
+    query_budgets = {
+        "list": 16, "retrieve": 16, "create": 21, "update": 26, "partial_update": 26, "destroy": 11,
+        "export": 3
+    }
 
     def get_queryset(self):
+        selection = FieldSelection.from_request(self.request)  # ?fields= and ?expand=
         if self.action == "list":
-            return self.request.user.contributor.projects_contribution.all()
+            return ProjectSerializer.setup_eager_loading(
+                self.request.user.contributor.projects_contribution.all(), selection
+            )
+        elif self.action == "retrieve":
+            return ProjectSerializer.setup_eager_loading(
+                Project.objects.filter(id=self.kwargs.get("pk")), selection
+            )
         else:
             return Project.objects.filter(id=self.kwargs.get("pk"))
 
     def perform_create(self, serializer):
         contributors: list[Contributor] = [self.request.user.contributor]
         if self.request.data.get("contributors"):
-            for name in self.request.data.get("contributors").split(","):
-                contributor = Contributor.objects.filter(user__username=name.strip()).first()
-                contributors.append(contributor)
-        serializer.save(
+            names: set[str] = {
+                name.strip() for name in self.request.data.get("contributors").split(",") if name.strip()
+            }
+            found: list[Contributor] = list(
+                Contributor.objects.select_related("user").filter(user__username__in=names)
+            )
+            unknown_names: set[str] = names - {contributor.username for contributor in found}
+            if unknown_names:
+                raise ValidationError({"contributors": [
+                    f"Contributor with username {name} does not exist." for name in sorted(unknown_names)
+                ]})
+            contributors += [contributor for contributor in found if contributor != contributors[0]]
+        project: Project = serializer.save(
             author=self.request.user.contributor,
             contributors=contributors
         )
+        # the response embeds the whole team: reload it with the list/retrieve prefetches
+        serializer.instance = ProjectSerializer.setup_eager_loading(Project.objects.filter(pk=project.pk)).get()
+
+    @action(detail=True, methods=["get"], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request, pk=None):
+        """Every issue of the project with its comments, streamed as ?format=ndjson (default) or csv"""
+        project: Project = self.get_object()
+        issues = iter_issues(project.id, self.export_chunk_size)
+        if request.accepted_renderer.format == CSVRenderer.format:
+            response = StreamingHttpResponse(
+                stream_csv(CSV_HEADER, iter_csv_rows(issues)), content_type=CSVRenderer.media_type
+            )
+        else:
+            response = StreamingHttpResponse(
+                stream_ndjson(issues, FastJSONRenderer()), content_type=NDJSONRenderer.media_type
+            )
+        response["Content-Disposition"] = \
+            f'attachment; filename="project-{project.id}.{request.accepted_renderer.format}"'
+        return response
 
 
-class IssueViewSet(ModelViewSet):
+class IssueViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, StreamingListMixin,
+                   BulkCreateMixin, ModelViewSet):
     queryset = Issue.objects.none()  # redefined in get_queryset()
     serializer_class = IssueSerializer
     permission_classes = [IsAuthenticated, IsContributorOrOwner]
+    filter_backends = [IssueFilterBackend]  # ?project= ?state= ... ?ordering=
+    version_path = "project__"
+    cursor_ordering = ("created_time", "id")  # opt-in with ?cursor=
+    query_budgets = {
+        "list": 9, "retrieve": 9, "create": 14, "update": 14, "partial_update": 14, "destroy": 9,
+        "bulk": 9
+    }
 
     def get_queryset(self):
+        selection = FieldSelection.from_request(self.request)  # ?fields= and ?expand=
         if self.action == "list":
-            assigned_issues: Issue = self.request.user.contributor.assigned_issues.all()
-            authored_issues: Issue = self.request.user.contributor.authored_issues.all()
-            issues: QuerySet = assigned_issues | authored_issues
-            return issues.distinct()
+            contributor: Contributor = self.request.user.contributor
+            issues: QuerySet = Issue.objects.filter(Q(assigned_contributor=contributor) | Q(author=contributor))
+            return IssueSerializer.setup_eager_loading(issues, selection)
+        elif self.action == "retrieve":
+            return IssueSerializer.setup_eager_loading(
+                Issue.objects.filter(id=self.kwargs.get("pk")), selection
+            )
         else:
             return Issue.objects.filter(id=self.kwargs.get("pk"))
 
+    def get_lookup_cache(self, items: list[dict]) -> dict:
+        project_ids = {str(item.get("project")) for item in items}
+        assignees = {str(item["assigned_contributor"]) for item in items if item.get("assigned_contributor")}
+        lookup_cache: dict = {
+            (Project, str(project.id)): project
+            for project in Project.objects.filter(id__in=[pk for pk in project_ids if pk.isdigit()])
+        }
+        contributors: QuerySet = Contributor.objects.select_related("user").filter(
+            Q(id__in=[value for value in assignees if value.isdigit()])
+            | Q(user__username__in=[value for value in assignees if not value.isdigit()])
+        )
+        for contributor in contributors:  # digit values are IDs, as in ContributorField
+            if str(contributor.id) in assignees:
+                lookup_cache[(Contributor, str(contributor.id))] = contributor
+            if contributor.user.username in assignees and not contributor.user.username.isdigit():
+                lookup_cache[(Contributor, contributor.user.username)] = contributor
+        return lookup_cache
+
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, ConditionalGetMixin, CachedResponseMixin, StreamingListMixin,
+                     BulkCreateMixin, ModelViewSet):
     queryset = Comment.objects.none()  # redefined in get_queryset()
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated, IsContributorOrOwner]
+    version_path = "issue__project__"
+    cursor_ordering = ("created_time", "id")  # opt-in with ?cursor=
+    query_budgets = {
+        "list": 8, "retrieve": 8, "create": 12, "update": 12, "partial_update": 12, "destroy": 6,
+        "bulk": 9
+    }
 
     def get_queryset(self):
+        selection = FieldSelection.from_request(self.request)  # ?fields= and ?expand=
         if self.action == "list":
-            user_contributor = self.request.user.contributor
-            project_ids = user_contributor.projects_contribution.values_list('id', flat=True)
-            project_comments = Comment.objects.filter(issue__project__id__in=project_ids).distinct()
-            return project_comments
+            # one join down to the (project, contributor) unique membership: no duplicates to remove
+            project_comments = Comment.objects.filter(issue__project__contributors=self.request.user.contributor)
+            return CommentSerializer.setup_eager_loading(project_comments, selection)
+        elif self.action == "retrieve":
+            return CommentSerializer.setup_eager_loading(
+                Comment.objects.filter(id=self.kwargs.get("pk")), selection
+            )
         else:
             return Comment.objects.filter(id=self.kwargs.get("pk"))
 
+    def get_lookup_cache(self, items: list[dict]) -> dict:
+        issue_ids = {str(item.get("issue")) for item in items}
+        return {
+            (Issue, str(issue.id)): issue
+            for issue in Issue.objects.filter(id__in=[pk for pk in issue_ids if pk.isdigit()])
+        }
+
+
+class SearchViewSet(ReplicaReadMixin, GenericViewSet):
+    """
+    GET /search/?q= : projects and comments of the caller's projects containing every
+    word of q, best ranked first, through the full-text indexes of search.py
+    """
+    serializer_class = SearchHitSerializer
+    permission_classes = [IsAuthenticated]
+    search_query_param = "q"
+    query_budgets = {"list": 2}
+
+    def list(self, request):
+        terms: list[str] = search_terms(request.query_params.get(self.search_query_param, ""))
+        if not terms:
+            raise ValidationError({self.search_query_param: ["Enter at least one word to search for."]})
+        page = self.paginate_queryset(SearchResults(terms, request.user.contributor.id))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+
+class AsyncReadView(APIView):
+    """
+    List (no pk) and retrieve of `viewset_class` for ASGI servers: the queries, the
+    pagination and the membership check are awaited on the async ORM instead of holding
+    a worker thread. Querysets, serializers and permissions are those of the viewset;
+    response caching, ETags, ?stream=true and read-your-writes pins of the
+    synchronous endpoints are not applied here, replica reads are.
+    """
+    viewset_class: type[GenericViewSet] = None
+    http_method_names = ["get", "head"]
+    schema = None  # same payloads as the viewset endpoints
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        replica_token = None
+        try:
+            if request.method.lower() not in self.http_method_names:
+                raise MethodNotAllowed(request.method)
+            await self.ainitial(request, *args, **kwargs)
+            if not await ais_pinned_to_primary(request.user.pk):
+                replica_token = replica_reads.set(True)
+            response = await self.get(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        finally:
+            if replica_token is not None:
+                replica_reads.reset(replica_token)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """initial(), then the contributor of the user, which the viewset querysets start from"""
+        await sync_to_async(self.initial)(request, *args, **kwargs)  # authenticates and checks permissions
+        if not User.contributor.is_cached(request.user):  # set from the token claims
+            contributor = await Contributor.objects.filter(user_id=request.user.pk).afirst()
+            if contributor is None:
+                raise PermissionDenied()
+            request.user.contributor = contributor
+
+    def get_viewset(self, request, action: str) -> GenericViewSet:
+        return self.viewset_class(
+            request=request, args=self.args, kwargs=self.kwargs, format_kwarg=self.format_kwarg, action=action
+        )
+
+    async def get(self, request, *args, **kwargs):
+        if "pk" in kwargs:
+            return await self.retrieve(self.get_viewset(request, "retrieve"), request, kwargs["pk"])
+        return await self.list(self.get_viewset(request, "list"), request)
+
+    @staticmethod
+    async def list(viewset: GenericViewSet, request) -> Response:
+        queryset: QuerySet = viewset.filter_queryset(viewset.get_queryset())
+        page = await viewset.paginator.apaginate_queryset(queryset, request, view=viewset)
+        if page is None:
+            return Response(viewset.get_serializer([obj async for obj in queryset], many=True).data)
+        return viewset.paginator.get_paginated_response(viewset.get_serializer(page, many=True).data)
+
+    @staticmethod
+    async def retrieve(viewset: GenericViewSet, request, pk: str) -> Response:
+        try:
+            obj = await viewset.filter_queryset(viewset.get_queryset()).aget(pk=pk)
+        except (ObjectDoesNotExist, ValueError, TypeError, DjangoValidationError):
+            raise Http404(f"No {viewset.get_serializer_class().Meta.model._meta.object_name} matches the given query.")
+        await aget_project_ids(request)  # check_object_permissions() reads them from the request
+        viewset.check_object_permissions(request, obj)
+        return Response(viewset.get_serializer(obj).data)
+
 
 class CustomTokenObtainPairView(TokenObtainPairView):
+    serializer_class = ContributorTokenObtainPairSerializer
+    throttle_classes = [UsernameLoginThrottle, ClientLoginThrottle]
+
     def post(self, request, *args, **kwargs):
         response: dict = super().post(request, *args, **kwargs).data
         response.pop("refresh", None)